@@ -0,0 +1,104 @@
+# -*- coding: utf-8 -*-
+'''
+Compare a 2-index MIDict (a bidirectional map) with a pair of normal dicts
+(a forward dict and an inverse dict) for get/set/delete/inverse lookups.
+
+Usage::
+
+    python benchmarks/bench_bidict.py [n_items]
+'''
+from __future__ import absolute_import, division, print_function
+
+import sys, os
+import timeit
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from midict import MIDict
+
+
+def bench_dict(keys, values):
+    fwd = dict(zip(keys, values))
+    inv = dict(zip(values, keys))
+
+    def get():
+        for k in keys:
+            fwd[k]
+
+    def inverse():
+        for v in values:
+            inv[v]
+
+    def set_():
+        for k, v in zip(keys, values):
+            del inv[fwd[k]]
+            fwd[k] = v
+            inv[v] = k
+
+    copies = []
+
+    def copy():
+        copies[:] = [dict(fwd), dict(inv)]
+
+    def delete():
+        f, i = copies
+        for k in keys:
+            del i[f.pop(k)]
+
+    return [('get', get, None), ('inverse', inverse, None), ('set', set_, None),
+            ('delete', delete, copy)]
+
+
+def bench_midict(keys, values):
+    d = MIDict(zip(keys, values), ['key', 'value'])
+
+    def get():
+        for k in keys:
+            d[k]
+
+    def inverse():
+        for v in values:
+            d[:v]
+
+    def set_():
+        for k, v in zip(keys, values):
+            d[k] = v
+
+    copies = []
+
+    def copy():
+        copies[:] = [d.copy()]
+
+    def delete():
+        d2 = copies[0]
+        for k in keys:
+            del d2[k]
+
+    return [('get', get, None), ('inverse', inverse, None), ('set', set_, None),
+            ('delete', delete, copy)]
+
+
+def timing(func, setup, n_items):
+    'best time (us) per item of ``func`` over 3 runs, each after ``setup()``'
+    times = []
+    for i in range(3):
+        if setup is not None:
+            setup()
+        times.append(timeit.timeit(func, number=1))
+    return min(times) / n_items * 1e6
+
+
+def main(n_items=100000):
+    keys = ['k%s' % i for i in range(n_items)]
+    values = list(range(n_items))
+    print('%s items, time per operation (us)\n' % n_items)
+    print('%-10s%10s%10s%10s' % ('', 'dict', 'MIDict', 'ratio'))
+    for (name, f1, s1), (_, f2, s2) in zip(bench_dict(keys, values),
+                                           bench_midict(keys, values)):
+        t1 = timing(f1, s1, n_items)
+        t2 = timing(f2, s2, n_items)
+        print('%-10s%10.3f%10.3f%10.1f' % (name, t1, t2, t2 / t1))
+
+
+if __name__ == '__main__':
+    main(*[int(a) for a in sys.argv[1:]])
@@ -0,0 +1,55 @@
+# -*- coding: utf-8 -*-
+'''
+Compare ``d.diff(other)`` and ``d.apply_patch(patch)`` of two 2-index
+MIDicts (with 1% of the items changed, added or removed) with a diff
+computed by iterating through ``items()`` of both.
+
+Usage::
+
+    python benchmarks/bench_diff.py [n_items]
+'''
+from __future__ import absolute_import, division, print_function
+
+import sys, os
+import timeit
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from midict import MIDict
+
+
+def diff_items(d, other):
+    'the patch from ``d`` to ``other`` via iterating through their items'
+    patch = {'added': [], 'removed': [], 'changed': []}
+    for key, value in other.items():
+        if key not in d:
+            patch['added'].append((key, value))
+        elif d[key] != value:
+            patch['changed'].append((key, value))
+    patch['removed'] = [key for key in d if key not in other]
+    return patch
+
+
+def main(n_items=1000000):
+    names = ['key', 'value']
+    d = MIDict((('k%s' % i, i) for i in range(n_items)), names)
+    step = 100
+    other = MIDict(((k, -v if v % step == 1 else v) for k, v in d.items()
+                    if v % step), names) # changed and removed items
+    other.update(('new%s' % i, n_items + i) for i in range(0, n_items, step))
+    print('%s items, time (s)\n' % n_items)
+    t_items = min(timeit.repeat(lambda: diff_items(d, other), number=1, repeat=3))
+    t_diff = min(timeit.repeat(lambda: d.diff(other), number=1, repeat=3))
+    patch = d.diff(other)
+    assert patch == diff_items(d, other)
+    copies = []
+    t_patch = min(timeit.repeat(lambda: copies[-1].apply_patch(patch), number=1, repeat=3,
+                                setup=lambda: copies.append(d.copy())))
+    assert copies[-1] == other
+    print('%-24s%10.3f' % ('diff via items()', t_items))
+    print('%-24s%10.3f' % ('d.diff(other)', t_diff))
+    print('%-24s%10.3f' % ('d.apply_patch(patch)', t_patch))
+
+
+if __name__ == '__main__':
+    main(*[int(a) for a in sys.argv[1:]])
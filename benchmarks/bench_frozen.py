@@ -0,0 +1,66 @@
+# -*- coding: utf-8 -*-
+'''
+Compare the memory usage, the loading time from a MIDict and the lookup
+speed of FrozenMIDict (a frozen MIFrozenStore) with a FrozenMIDict keeping
+its items in a MIRowStore (like a MIDict).
+
+Usage::
+
+    python benchmarks/bench_frozen.py [n_items]
+'''
+from __future__ import absolute_import, division, print_function
+
+import gc
+import sys, os
+import timeit
+import tracemalloc
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from midict import FrozenMIDict, MIDict, MIRowStore
+
+class RowFrozenMIDict(FrozenMIDict):
+    store_class = MIRowStore
+
+
+def measure_memory(func):
+    'memory (bytes) allocated by the object returned by ``func()``'
+    gc.collect()
+    tracemalloc.start()
+    obj = func()
+    size = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    del obj
+    return size
+
+
+def bench(cls, d, keys, values):
+    f = cls(d)
+
+    def get():
+        for k in keys:
+            f[k]
+
+    def inverse():
+        for v in values:
+            f[:v]
+
+    return [('memory (MB)', measure_memory(lambda: cls(d)) / 2**20),
+            ('load from MIDict (s)', min(timeit.repeat(lambda: cls(d), number=1, repeat=3))),
+            ('get (s)', min(timeit.repeat(get, number=1, repeat=3))),
+            ('inverse (s)', min(timeit.repeat(inverse, number=1, repeat=3)))]
+
+
+def main(n_items=1000000):
+    keys = ['k%s' % i for i in range(n_items)]
+    values = list(range(n_items))
+    d = MIDict(zip(keys, values), ['key', 'value'])
+    print('%s items, 2 indices\n' % n_items)
+    print('%-24s%14s%14s' % ('', 'MIRowStore', 'MIFrozenStore'))
+    for (name, t1), (_, t2) in zip(bench(RowFrozenMIDict, d, keys, values),
+                                   bench(FrozenMIDict, d, keys, values)):
+        print('%-24s%14.3f%14.3f' % (name, t1, t2))
+
+
+if __name__ == '__main__':
+    main(*[int(a) for a in sys.argv[1:]])
@@ -0,0 +1,97 @@
+# -*- coding: utf-8 -*-
+'''
+Compare the memory usage and the insert/delete speed of MIDict with
+normal dicts (the default in Python 3.7+) and with OrderedDicts as the
+dicts of the secondary indices and the row store.
+
+Usage::
+
+    python benchmarks/bench_index_dict.py [n_items]
+'''
+from __future__ import absolute_import, division, print_function
+
+import gc
+import sys, os
+import timeit
+import tracemalloc
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from midict import AttrOrdDict, MIDict, MIRowStore, OrderedDict
+
+class OrdRowStore(MIRowStore, OrderedDict):
+    'MIRowStore backed by an OrderedDict'
+
+
+class OrdMIDict(MIDict):
+    store_class = OrdRowStore
+    index_class = AttrOrdDict
+
+
+def measure_memory(func):
+    'memory (bytes) allocated by the object returned by ``func()``'
+    gc.collect()
+    tracemalloc.start()
+    obj = func()
+    size = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    del obj
+    return size
+
+
+def timing(func, setup):
+    'best time (s) of ``func(setup())`` over 3 runs'
+    times = []
+    for i in range(3):
+        arg = setup()
+        times.append(timeit.timeit(lambda: func(arg), number=1))
+    return min(times)
+
+
+def bench_dict(cls, keys):
+    def insert(d):
+        for k in keys:
+            d[k] = k
+
+    def delete(d):
+        for k in keys:
+            del d[k]
+
+    return [('memory (MB)', measure_memory(lambda: cls(zip(keys, keys))) / 2**20),
+            ('insert (s)', timing(insert, cls)),
+            ('delete (s)', timing(delete, lambda: cls(zip(keys, keys))))]
+
+
+def bench_midict(cls, keys, values):
+    def insert(d):
+        for k, v in zip(keys, values):
+            d[k] = v
+
+    def delete(d):
+        for k in keys:
+            del d[k]
+
+    def make():
+        return cls(zip(keys, values), ['key', 'value'])
+
+    return [('memory (MB)', measure_memory(make) / 2**20),
+            ('insert (s)', timing(insert, lambda: cls([], ['key', 'value']))),
+            ('delete (s)', timing(delete, make))]
+
+
+def main(n_items=1000000):
+    keys = ['k%s' % i for i in range(n_items)]
+    values = list(range(n_items))
+    print('%s items\n' % n_items)
+    print('%-24s%14s%14s' % ('', 'OrderedDict', 'dict'))
+    results = [('index dict', bench_dict(OrderedDict, keys), bench_dict(dict, keys)),
+               ('MIDict (2 indices)', bench_midict(OrdMIDict, keys, values),
+                bench_midict(MIDict, keys, values))]
+    for label, r1, r2 in results:
+        print(label)
+        for (name, t1), (_, t2) in zip(r1, r2):
+            print('  %-22s%14.3f%14.3f' % (name, t1, t2))
+
+
+if __name__ == '__main__':
+    main(*[int(a) for a in sys.argv[1:]])
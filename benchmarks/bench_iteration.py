@@ -0,0 +1,45 @@
+# -*- coding: utf-8 -*-
+'''
+Compare full scans (iterating through keys, values and items) of a 2-index
+MIDict with a normal dict, for both row stores.
+
+Usage::
+
+    python benchmarks/bench_iteration.py [n_items]
+'''
+from __future__ import absolute_import, division, print_function
+
+import sys, os
+import timeit
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from midict import MIColumnStore, MIDict
+
+
+class ColumnMIDict(MIDict):
+    store_class = MIColumnStore
+
+
+def scans(d):
+    return [('keys', lambda: list(d.keys())),
+            ('values', lambda: list(d.values())),
+            ('items', lambda: list(d.items())),
+            ('for k, v in items', lambda: [v for k, v in d.items()])]
+
+
+def main(n_items=1000000):
+    items = [('k%s' % i, i) for i in range(n_items)]
+    dicts = [('dict', dict(items)),
+             ('MIDict', MIDict(items, ['key', 'value'])),
+             ('ColumnMIDict', ColumnMIDict(items, ['key', 'value']))]
+    print('%s items, time (s)\n' % n_items)
+    print('%-20s' % '' + ''.join('%14s' % label for label, d in dicts))
+    results = [[min(timeit.repeat(f, number=1, repeat=5)) for name, f in scans(d)]
+               for label, d in dicts]
+    for k, (name, f) in enumerate(scans(dicts[0][1])):
+        print('%-20s' % name + ''.join('%14.4f' % r[k] for r in results))
+
+
+if __name__ == '__main__':
+    main(*[int(a) for a in sys.argv[1:]])
@@ -0,0 +1,46 @@
+# -*- coding: utf-8 -*-
+'''
+Measure pickling a 3-index MIDict (str, int and float indices) with each
+pickle protocol, including protocol 5 with out-of-band buffers.
+
+Usage::
+
+    python benchmarks/bench_pickle.py [n_items]
+'''
+from __future__ import absolute_import, division, print_function
+
+import pickle
+import sys, os
+import timeit
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from midict import MIDict
+
+
+def main(n_items=1000000):
+    d = MIDict((['k%s' % i, i, i + 0.5] for i in range(n_items)), ['key', 'id', 'score'])
+    print('%s items, 3 indices\n' % n_items)
+    print('%-20s%12s%12s%12s' % ('protocol', 'size (MB)', 'dumps (s)', 'loads (s)'))
+    protocols = [(str(p), p, None) for p in range(2, pickle.HIGHEST_PROTOCOL + 1)]
+    if pickle.HIGHEST_PROTOCOL >= 5:
+        protocols.append(('5 (out-of-band)', 5, []))
+    for label, protocol, buffers in protocols:
+        kw = {} if buffers is None else {'buffer_callback': buffers.append}
+
+        def dumps():
+            if buffers is not None:
+                del buffers[:]
+            return pickle.dumps(d, protocol, **kw)
+
+        s = dumps()
+        size = len(s) + sum(memoryview(b).nbytes for b in buffers or [])
+        t_dumps = min(timeit.repeat(dumps, number=1, repeat=3))
+        s = dumps()
+        kw = {} if buffers is None else {'buffers': buffers}
+        t_loads = min(timeit.repeat(lambda: pickle.loads(s, **kw), number=1, repeat=3))
+        print('%-20s%12.1f%12.3f%12.3f' % (label, size / 2**20, t_dumps, t_loads))
+
+
+if __name__ == '__main__':
+    main(*[int(a) for a in sys.argv[1:]])
@@ -0,0 +1,77 @@
+# -*- coding: utf-8 -*-
+'''
+Compare the memory usage and speed of the row stores of MIDict:
+MIRowStore (the default) and MIColumnStore.
+
+Usage::
+
+    python benchmarks/bench_storage.py [n_items] [n_indices]
+'''
+from __future__ import absolute_import, division, print_function
+
+import gc
+import sys, os
+import timeit
+import tracemalloc
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from midict import MIColumnStore, MIDict
+
+class ColumnMIDict(MIDict):
+    store_class = MIColumnStore
+
+
+def make_rows(n_items, n_indices):
+    return [[i] + ['%s_%s' % (k, i) for k in range(1, n_indices)]
+            for i in range(n_items)]
+
+
+def measure_memory(cls, rows, names):
+    'memory (bytes) allocated by the dict itself (excluding the values)'
+    gc.collect()
+    tracemalloc.start()
+    d = cls(rows, names)
+    size = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    del d
+    return size
+
+
+def bench(cls, rows, names, number=3):
+    d = cls(rows, names)
+    keys = [row[0] for row in rows[::7]]
+    tests = [
+        ('construct', lambda: cls(rows, names)),
+        ('keys()', lambda: list(d.keys())),
+        ('values(index)', lambda: list(d.values(names[-1]))),
+        ('items([2 indices])', lambda: list(d.items([names[0], names[-1]]))),
+        ('get_many', lambda: d.get_many(keys, columns=names[-1])),
+        ('getitem', lambda: [d[names[0]:k, names[-1]] for k in keys]),
+    ]
+    result = []
+    for name, func in tests:
+        t = min(timeit.repeat(func, number=1, repeat=number))
+        result.append((name, t))
+    return result
+
+
+def main(n_items=200000, n_indices=6):
+    rows = make_rows(n_items, n_indices)
+    names = ['index_%s' % i for i in range(n_indices)]
+    print('%s items, %s indices' % (n_items, n_indices))
+
+    classes = [('MIRowStore', MIDict), ('MIColumnStore', ColumnMIDict)]
+    print('\nmemory (MB):')
+    for label, cls in classes:
+        print('  %-14s %8.1f' % (label, measure_memory(cls, rows, names) / 2**20))
+
+    print('\ntime (s):')
+    results = [bench(cls, rows, names) for label, cls in classes]
+    print('  %-20s' % '' + ''.join('%15s' % label for label, cls in classes))
+    for k, (name, t) in enumerate(results[0]):
+        print('  %-20s' % name + ''.join('%15.4f' % r[k][1] for r in results))
+
+
+if __name__ == '__main__':
+    main(*[int(a) for a in sys.argv[1:]])
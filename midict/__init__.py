@@ -2,26 +2,28 @@
 
 from __future__ import absolute_import, division, print_function #, unicode_literals
 
+import array
+import itertools
+import pickle
 import sys
+from copy import deepcopy
+from operator import itemgetter
 
 __version__ = '0.1.4'
 
 
-PY2 = sys.version_info[0] == 2
-PY3 = sys.version_info[0] == 3
+PY37 = sys.version_info >= (3, 7) # the built-in dict keeps the insertion order
 
-from collections import Hashable, ItemsView, KeysView, Mapping, OrderedDict, ValuesView
+from collections import OrderedDict
+from collections.abc import Hashable, ItemsView, KeysView, Mapping, ValuesView
+from threading import get_ident as _get_ident
 
 NoneType = type(None)
 
-if PY2:
-    from threading import _get_ident
-    string_types = str, unicode
-else:
-    from threading import get_ident as _get_ident
-    string_types = str, bytes
-    _map = map
-    map = lambda *args: list(_map(*args)) # always return a list
+string_types = str, bytes
+atomic_types = NoneType, bool, int, float, complex, str, bytes
+imap = _map = map
+map = lambda *args: list(_map(*args)) # always return a list
 
 
 #==============================================================================
@@ -38,7 +40,7 @@ def cvt_iter(a):
     '''
     Convert an iterator/generator to a tuple so that it can be iterated again.
 
-    E.g., convert zip in PY3.
+    E.g., convert zip.
     '''
     if a is None:
         return a
@@ -144,6 +146,754 @@ def convert_dict(d, cls=AttrDict): # not used
 
 
 
+#==============================================================================
+# PositionIndex
+#==============================================================================
+
+
+class PositionIndex(object):
+    '''
+    A sequence of unique hashable handles in the order of insertion, which
+    supports positional access in O(log n) time under appends and removals.
+
+    Each handle occupies a slot in the order of insertion, and a Fenwick tree
+    (binary indexed tree) over the slots counts the slots still in use, so that
+    the handle at a position (``p[i]``) and the position of a handle
+    (``p.index(handle)``) are found in O(log n) time. Removed slots are
+    compacted once they outnumber the handles in use.
+
+    Examples::
+
+        p = PositionIndex(['a', 'b', 'c'])
+        p.remove('a')
+        p.append('d')
+
+        list(p) -> ['b', 'c', 'd']
+        p[0] -> 'b'
+        p[-1] -> 'd'
+        p[1:] -> ['c', 'd']
+        p.index('c') -> 1
+    '''
+
+    _removed = object() # marker of removed slots
+
+    def __init__(self, handles=()):
+        self._build(handles)
+
+    def _build(self, handles):
+        'build the slots and the Fenwick tree in O(n) time'
+        self._slots = slots = list(handles)
+        self._slot_of = dict((h, i) for i, h in enumerate(slots))
+        if len(self._slot_of) != len(slots):
+            raise ValueError('Handles are not unique')
+        m = len(slots)
+        tree = [1] * (m + 1)
+        tree[0] = 0
+        for i in range(1, m + 1):
+            j = i + (i & -i)
+            if j <= m:
+                tree[j] += tree[i]
+        self._tree = tree
+
+    def _prefix(self, i):
+        'number of handles in the first ``i`` slots'
+        tree = self._tree
+        n = 0
+        while i > 0:
+            n += tree[i]
+            i -= i & -i
+        return n
+
+    def _add(self, i, delta):
+        'add ``delta`` to the count of slot ``i`` (0-based)'
+        tree = self._tree
+        m = len(tree) - 1
+        i += 1
+        while i <= m:
+            tree[i] += delta
+            i += i & -i
+
+    def _find(self, k):
+        'the slot (0-based) of the handle at the position ``k`` (0-based)'
+        tree = self._tree
+        m = len(tree) - 1
+        slot = 0
+        bit = 1 << (m.bit_length() - 1) if m else 0
+        while bit:
+            nxt = slot + bit
+            if nxt <= m and tree[nxt] <= k:
+                slot = nxt
+                k -= tree[nxt]
+            bit >>= 1
+        return slot
+
+    def __len__(self):
+        return len(self._slot_of)
+
+    def __contains__(self, handle):
+        return handle in self._slot_of
+
+    def __iter__(self):
+        removed = self._removed
+        for h in self._slots:
+            if h is not removed:
+                yield h
+
+    def __reversed__(self):
+        removed = self._removed
+        for h in reversed(self._slots):
+            if h is not removed:
+                yield h
+
+    def __repr__(self):
+        return '%s(%r)' % (self.__class__.__name__, list(self))
+
+    def append(self, handle):
+        'add a new ``handle`` at the end'
+        if handle in self._slot_of:
+            raise ValueError('Handle already exists: %r' % (handle,))
+        tree = self._tree
+        i = len(tree) # 1-based index of the new slot
+        # count of the range of slots covered by tree[i]
+        tree.append(1 + self._prefix(i - 1) - self._prefix(i - (i & -i)))
+        self._slot_of[handle] = len(self._slots)
+        self._slots.append(handle)
+
+    def remove(self, handle):
+        'remove an existing ``handle``'
+        try:
+            slot = self._slot_of.pop(handle)
+        except KeyError:
+            raise ValueError('Handle not found: %r' % (handle,))
+        self._slots[slot] = self._removed
+        self._add(slot, -1)
+        n = len(self._slot_of)
+        if len(self._slots) - n > max(n, 16): # too many removed slots
+            self._build(list(self))
+
+    def replace(self, handle, new_handle):
+        'replace an existing ``handle`` by ``new_handle`` at the same position'
+        if new_handle in self._slot_of:
+            raise ValueError('Handle already exists: %r' % (new_handle,))
+        try:
+            slot = self._slot_of.pop(handle)
+        except KeyError:
+            raise ValueError('Handle not found: %r' % (handle,))
+        self._slot_of[new_handle] = slot
+        self._slots[slot] = new_handle
+
+    def index(self, handle):
+        'return the position of ``handle``'
+        try:
+            slot = self._slot_of[handle]
+        except KeyError:
+            raise ValueError('Handle not found: %r' % (handle,))
+        return self._prefix(slot)
+
+    def __getitem__(self, pos):
+        'get the handle at the position ``pos`` (int), or a list of handles (slice)'
+        n = len(self)
+        if isinstance(pos, slice):
+            start, stop, step = pos.indices(n)
+            count = len(range(start, stop, step))
+            if count == 0:
+                return []
+            removed = self._removed
+            slots = self._slots
+            slot = self._find(start)
+            inc = 1 if step > 0 else -1
+            result = [slots[slot]]
+            skip = 0
+            while len(result) < count:
+                slot += inc
+                h = slots[slot]
+                if h is removed:
+                    continue
+                skip += 1
+                if skip == abs(step):
+                    result.append(h)
+                    skip = 0
+            return result
+
+        if pos < 0:
+            pos += n
+        if not 0 <= pos < n:
+            raise IndexError('Position out of range: %s' % (pos,))
+        return self._slots[self._find(pos)]
+
+
+#==============================================================================
+# row stores
+#==============================================================================
+
+
+def _identity(value):
+    return value
+
+
+_MI_FP_SALT = 0x9E3779B97F4A7C15 # mixed into the hash of each row
+_MI_FP_MASK = 2**64 - 1 # the fingerprint is the sum modulo 2**64
+
+
+def _MI_row_hash(row):
+    '''return the hash of ``row`` (sequence of values) as a tuple, mixed with
+    a salt: the raw hashes of tuples are too regular to be summed (e.g., the
+    rows [[1, 2], [3, 4]] and [[1, 4], [3, 2]] have equal sums)'''
+    return hash((hash(tuple(row)), _MI_FP_SALT))
+
+
+def _MI_rows_hash(rows):
+    'return the sum of the mixed hashes of ``rows`` (see ``_MI_row_hash()``)'
+    return sum(imap(_MI_row_hash, rows))
+
+
+def _row_getter(index):
+    '''return a function to get the value in ``index`` (int) or a tuple of
+    the values in ``index`` (list of int) of a row'''
+    if isinstance(index, int):
+        return itemgetter(index)
+    elif len(index) > 1:
+        return itemgetter(*index)
+    else:
+        return lambda row: tuple(row[i] for i in index)
+
+
+class MIRowStore(dict if PY37 else OrderedDict):
+    '''
+    Row-oriented storage of the items of a MIMapping (the default):
+    an ordered dict of row id -> list of values in all indices
+    (a normal dict in Python 3.7+, otherwise an OrderedDict).
+
+    A row store (``MIRowStore`` or ``MIColumnStore``) assigns the row ids
+    (``append()`` and ``extend()``), keeps the rows in the order of items,
+    and provides access to single values (``get_value()``, ``set_value()``)
+    and whole columns (``column()``, ``zip_columns()``) of the rows.
+    It also keeps a ``fingerprint()`` of the rows.
+    '''
+
+    holes = 0 # deleted rows leave no holes
+    _cow = None # row ids of the rows shared with another store (see share())
+    _fp = None # fingerprint of the rows, maintained after the first use
+
+    def __init__(self, n_index=0):
+        super(MIRowStore, self).__init__()
+        self._count = itertools.count() # generator of new row ids
+        self._whole = force_list(range(n_index)) # the index of whole rows
+        self._front = {} # row ids moved to the beginning (see move_to_end())
+
+    def append(self, row):
+        'add a ``row`` (list) at the end, and return its row id'
+        rid = next(self._count)
+        self[rid] = row
+        if self._fp is not None:
+            self._fp += _MI_row_hash(row)
+        return rid
+
+    def extend(self, rows):
+        'add ``rows`` (list of lists) at the end, and return their row ids'
+        start = next(self._count)
+        rids = range(start, start + len(rows))
+        self._count = itertools.count(start + len(rows))
+        self.update(zip(rids, rows))
+        if self._fp is not None:
+            self._fp += _MI_rows_hash(rows)
+        return rids
+
+    def pop(self, rid):
+        'remove the row ``rid`` and return it'
+        row = super(MIRowStore, self).pop(rid)
+        if self._front:
+            self._front.pop(rid, None)
+        if self._cow:
+            self._cow.discard(rid)
+            if not self._cow:
+                self._cow = None # all the rows are private
+        if self._fp is not None:
+            self._fp -= _MI_row_hash(row)
+        return row
+
+    def clear(self):
+        super(MIRowStore, self).clear()
+        self._front.clear()
+        self._cow = None
+        if self._fp is not None:
+            self._fp = 0
+
+    def extend_columns(self, columns):
+        '''add rows given by their ``columns`` (sequences of the values in
+        each index) at the end, and return their row ids'''
+        return self.extend(force_list(imap(list, zip(*columns))))
+
+    def positions(self):
+        'return a ``PositionIndex`` of the row ids in order'
+        return PositionIndex(self)
+
+    if PY37:
+        def move_to_end(self, rid, last=True):
+            '''move the row ``rid`` to either end (as ``OrderedDict.move_to_end``)
+            in O(1) time. A plain dict cannot insert at the beginning, so the
+            rows moved there are only recorded in ``_front``, and moved
+            all at once the next time the rows are read in order.'''
+            front = self._front
+            if last:
+                self[rid] = super(MIRowStore, self).pop(rid)
+                if front:
+                    front.pop(rid, None)
+            else:
+                self[rid] # KeyError if not found
+                front.pop(rid, None)
+                front[rid] = None # the last one moved is the first one
+
+        def _move_front(self):
+            'move the rows recorded in ``_front`` to the beginning in O(n) time'
+            front = self._front
+            pop = super(MIRowStore, self).pop
+            rows = [(rid, pop(rid)) for rid in reversed(list(front))]
+            rows.extend(dict.items(self))
+            super(MIRowStore, self).clear()
+            self.update(rows)
+            front.clear()
+
+        def __iter__(self):
+            if self._front:
+                self._move_front()
+            return super(MIRowStore, self).__iter__()
+
+        def __reversed__(self):
+            if self._front:
+                self._move_front()
+            if hasattr(dict, '__reversed__'):
+                return super(MIRowStore, self).__reversed__()
+            return reversed(list(self)) # Python 3.7
+
+        def keys(self):
+            if self._front:
+                self._move_front()
+            return super(MIRowStore, self).keys()
+
+        def values(self):
+            if self._front:
+                self._move_front()
+            return super(MIRowStore, self).values()
+
+        def items(self):
+            if self._front:
+                self._move_front()
+            return super(MIRowStore, self).items()
+
+    def get_value(self, rid, index):
+        'return the value in the ``index`` (int) of the row ``rid``'
+        return self[rid][index]
+
+    def set_value(self, rid, index, value):
+        'set the value in the ``index`` (int) of the row ``rid``'
+        row = self[rid]
+        cow = self._cow
+        if cow and rid in cow: # copy a shared row once
+            self[rid] = row = list(row)
+            cow.discard(rid)
+            if not cow:
+                self._cow = None # all the rows are private
+        if self._fp is not None:
+            self._fp -= _MI_row_hash(row)
+            row[index] = value
+            self._fp += _MI_row_hash(row)
+        else:
+            row[index] = value
+
+    def column(self, index):
+        'iterate through the values in the ``index`` (int) of all rows'
+        return imap(itemgetter(index), self.values())
+
+    def reorder(self, index):
+        '''keep only the values in the ``index`` (list of int) of all rows in
+        that order, in place'''
+        if self._cow:
+            self._own_rows()
+        get_values = _row_getter(index)
+        for row in self.values():
+            row[:] = get_values(row)
+        self._whole = force_list(range(len(index)))
+        self._fp = None
+
+    def _new_store(self):
+        'return an empty store with the same indices and the next row ids'
+        start = next(self._count)
+        self._count = itertools.count(start)
+        new = self.__class__(len(self._whole))
+        new._count = itertools.count(start)
+        new._fp = self._fp
+        return new
+
+    def clone(self):
+        'return a copy of the store with a copy of each row (keeping the row ids)'
+        new = self._new_store()
+        new.update(zip(self.keys(), imap(list, self.values())))
+        return new
+
+    def share(self):
+        '''return a copy of the store that shares the rows with this one
+        (keeping the row ids): the copy copies each shared row once, before
+        changing it, and new rows are never shared'''
+        new = self._new_store()
+        new.update(self)
+        if new:
+            new._cow = set(dict.keys(new))
+        return new
+
+    def own(self, index=None):
+        '''nothing to copy before changing the values in ``index`` (list of
+        int, or all if None): the shared rows are copied one by one when
+        changed (see ``share()``). Return False (no column is replaced).'''
+        return False
+
+    def _own_rows(self):
+        'copy all the rows shared with another store (see share())'
+        for rid in self._cow:
+            self[rid] = list(self[rid])
+        self._cow = None
+
+    def add_column(self, values):
+        'add the ``values`` (list) at the end of all rows in order'
+        if self._cow:
+            self._own_rows()
+        map(list.append, self.values(), values)
+        self._whole.append(len(self._whole))
+        self._fp = None
+
+    def zip_columns(self, index):
+        'iterate through tuples of the values in the ``index`` (list of int) of all rows'
+        if index == self._whole:
+            return imap(tuple, self.values())
+        return imap(_row_getter(index), self.values())
+
+    def projection(self, index):
+        '''
+        Return ``(rows, project)`` so that ``project(rows[rid])`` is the value
+        in the ``index`` (int) of the row ``rid``, or a tuple of the values
+        in the ``index`` (list of int).
+        '''
+        return self, _row_getter(index)
+
+    def fingerprint(self):
+        '''
+        Return a fingerprint of the rows: the sum of the mixed hashes of the
+        rows (see ``_MI_row_hash()``) modulo 2**64, which does not depend on
+        the order of the rows. It is computed on first use, and then maintained
+        when rows are added, deleted or changed.
+        '''
+        if self._fp is None:
+            self._fp = _MI_rows_hash(self.values())
+        return self._fp & _MI_FP_MASK
+
+
+class MIColumnStore(object):
+    '''
+    Column-oriented storage of the items of a MIMapping: a list of values
+    for each index, where the row id of an item is its position in the
+    lists (see ``MIRowStore`` for the interface).
+
+    No list is kept per item, which takes much less memory for many items,
+    and whole columns (e.g., ``d.keys()`` or ``d.values(index)``) are read
+    without touching the other indices. Reading a whole row builds a new list.
+
+    Deleted rows leave holes in the lists (counted by ``holes``), which are
+    removed by ``_MI_compact()`` once they outnumber the rows.
+
+    Use it via the ``store_class`` attribute of a MIMapping subclass::
+
+        class ColumnMIDict(MIDict):
+            store_class = MIColumnStore
+    '''
+
+    __slots__ = ('columns', '_alive', '_len', '_fp', '_cow')
+
+    def __init__(self, n_index=0):
+        self.columns = [[] for i in range(n_index)]
+        self._alive = bytearray() # 1 for each row in use, 0 for each hole
+        self._len = 0
+        self._fp = None # see MIRowStore.fingerprint()
+        self._cow = None # positions of the columns shared with another store (see share())
+
+    @property
+    def holes(self):
+        'number of holes left by deleted rows'
+        return len(self._alive) - self._len
+
+    def __len__(self):
+        return self._len
+
+    def __contains__(self, rid):
+        alive = self._alive
+        return isinstance(rid, int) and 0 <= rid < len(alive) and alive[rid] == 1
+
+    def __iter__(self):
+        return itertools.compress(itertools.count(), self._alive)
+
+    def __reversed__(self):
+        alive = self._alive
+        return (rid for rid in range(len(alive) - 1, -1, -1) if alive[rid])
+
+    def __getitem__(self, rid):
+        if rid not in self:
+            raise KeyError(rid)
+        return [column[rid] for column in self.columns]
+
+    def values(self):
+        'iterate through the rows (lists) in order'
+        columns = [self.column(i) for i in range(len(self.columns))]
+        return (list(row) for row in zip(*columns))
+
+    def append(self, row):
+        'add a ``row`` (list) at the end, and return its row id'
+        if self._cow is not None:
+            self.own()
+        rid = len(self._alive)
+        for column, v in zip(self.columns, row):
+            column.append(v)
+        self._alive.append(1)
+        self._len += 1
+        if self._fp is not None:
+            self._fp += _MI_row_hash(row)
+        return rid
+
+    def extend(self, rows):
+        'add ``rows`` (list of lists) at the end, and return their row ids'
+        if self._cow is not None:
+            self.own()
+        start = len(self._alive)
+        for column, values in zip(self.columns, zip(*rows)):
+            column.extend(values)
+        self._alive.extend(bytearray([1]) * len(rows))
+        self._len += len(rows)
+        if self._fp is not None:
+            self._fp += _MI_rows_hash(rows)
+        return range(start, start + len(rows))
+
+    def extend_columns(self, columns):
+        '''add rows given by their ``columns`` (sequences of the values in
+        each index) at the end, and return their row ids'''
+        if self._cow is not None:
+            self.own()
+        start = len(self._alive)
+        n = len(columns[0])
+        for column, values in zip(self.columns, columns):
+            column.extend(values)
+        self._alive.extend(bytearray([1]) * n)
+        self._len += n
+        if self._fp is not None:
+            self._fp += _MI_rows_hash(zip(*columns))
+        return range(start, start + n)
+
+    def positions(self):
+        'return a ``PositionIndex`` of the row ids in order'
+        return PositionIndex(self)
+
+    def pop(self, rid):
+        'remove the row ``rid`` (leaving a hole) and return it'
+        row = self[rid]
+        if self._cow is not None:
+            self.own()
+        for column in self.columns:
+            column[rid] = None
+        self._alive[rid] = 0
+        self._len -= 1
+        if self._fp is not None:
+            self._fp -= _MI_row_hash(row)
+        return row
+
+    def clear(self):
+        if self._cow: # keep the shared columns
+            self.columns = [[] for column in self.columns]
+        else:
+            for column in self.columns: # in place, see projection()
+                del column[:]
+        self._cow = None
+        self._alive = bytearray()
+        self._len = 0
+        if self._fp is not None:
+            self._fp = 0
+
+    def get_value(self, rid, index):
+        'return the value in the ``index`` (int) of the row ``rid``'
+        return self.columns[index][rid]
+
+    def set_value(self, rid, index, value):
+        'set the value in the ``index`` (int) of the row ``rid``'
+        if self._cow and index in self._cow:
+            self.own([index])
+        if self._fp is not None:
+            row = self[rid]
+            self._fp -= _MI_row_hash(row)
+            row[index] = value
+            self._fp += _MI_row_hash(row)
+        self.columns[index][rid] = value
+
+    def column(self, index):
+        'iterate through the values in the ``index`` (int) of all rows'
+        if self.holes:
+            return itertools.compress(self.columns[index], self._alive)
+        return iter(self.columns[index])
+
+    def reorder(self, index):
+        '''keep only the columns in the ``index`` (list of int) in that order
+        (without copying the columns)'''
+        self.columns[:] = [self.columns[i] for i in index]
+        if self._cow:
+            self._cow = set(j for j, i in enumerate(index) if i in self._cow)
+        self._fp = None
+
+    def clone(self):
+        'return a copy of the store (keeping the row ids)'
+        new = self.__class__()
+        new.columns = [list(column) for column in self.columns]
+        new._alive = bytearray(self._alive)
+        new._len = self._len
+        new._fp = self._fp
+        return new
+
+    def share(self):
+        '''return a copy of the store that shares the columns with this one
+        (keeping the row ids): the copy copies a shared column once, before
+        changing it (see ``own()``)'''
+        new = self.__class__()
+        new.columns = list(self.columns)
+        new._alive = self._alive
+        new._len = self._len
+        new._fp = self._fp
+        new._cow = set(range(len(self.columns)))
+        return new
+
+    def own(self, index=None):
+        '''copy the columns in ``index`` (list of int) shared with another store
+        (see ``share()``) before changing their values, or all the shared
+        columns and the flags of the rows if ``index`` is None (before adding
+        or deleting rows). The columns are replaced (see ``projection()``):
+        return True if any column is replaced.'''
+        cow = self._cow
+        if cow is None:
+            return False
+        parts = list(cow) if index is None else cow.intersection(index)
+        for i in parts:
+            self.columns[i] = list(self.columns[i])
+            cow.discard(i)
+        if index is None:
+            self._alive = bytearray(self._alive)
+            self._cow = None
+        return bool(parts)
+
+    def add_column(self, values):
+        'add a column of the ``values`` (list) of all rows in order'
+        if self.holes:
+            values = iter(values)
+            column = [next(values) if alive else None for alive in self._alive]
+        else:
+            column = list(values)
+        self.columns.append(column)
+        self._fp = None
+
+    def zip_columns(self, index):
+        'iterate through tuples of the values in the ``index`` (list of int) of all rows'
+        if not index:
+            return (() for rid in self)
+        return zip(*[self.column(i) for i in index])
+
+    def projection(self, index):
+        '''
+        Return ``(rows, project)`` so that ``project(rows[rid])`` is the value
+        in the ``index`` (int) of the row ``rid``, or a tuple of the values
+        in the ``index`` (list of int).
+
+        A single value is read from its column directly (the columns are
+        only changed in place, or replaced by ``own()``).
+        '''
+        if isinstance(index, int):
+            return self.columns[index], _identity
+        return _MIColumnRows([self.columns[i] for i in index]), _identity
+
+    def fingerprint(self):
+        'see ``MIRowStore.fingerprint()``'
+        if self._fp is None:
+            self._fp = _MI_rows_hash(self.zip_columns(force_list(range(len(self.columns)))))
+        return self._fp & _MI_FP_MASK
+
+
+class _MIColumnRows(object):
+    '''rows of some columns of a MIColumnStore: ``rows[rid]`` is a tuple of
+    the values of the row ``rid``, read without building the whole row'''
+
+    __slots__ = ('columns',)
+
+    def __init__(self, columns):
+        self.columns = columns
+
+    def __getitem__(self, rid):
+        return tuple([column[rid] for column in self.columns])
+
+
+class MIFrozenStore(MIColumnStore):
+    '''
+    Compact column-oriented storage of the items of an immutable MIMapping
+    (the default of ``FrozenMIDict``): a ``MIColumnStore`` which is
+    ``freeze()``-d once the items are loaded, turning each column into a
+    tuple (no spare slots of lists). The row ids of a frozen store are the
+    positions of the items, so positional access needs no ``PositionIndex``.
+    '''
+
+    __slots__ = ()
+
+    def freeze(self):
+        'turn the columns into tuples; the store must have no holes'
+        if self.holes:
+            raise ValueError('Can not freeze a store with holes')
+        self.columns = [tuple(column) for column in self.columns]
+        self._alive = None
+
+    @property
+    def holes(self):
+        'number of holes left by deleted rows'
+        return 0 if self._alive is None else len(self._alive) - self._len
+
+    def __contains__(self, rid):
+        if self._alive is None:
+            return isinstance(rid, int) and 0 <= rid < self._len
+        return super(MIFrozenStore, self).__contains__(rid)
+
+    def __iter__(self):
+        if self._alive is None:
+            return iter(range(self._len))
+        return super(MIFrozenStore, self).__iter__()
+
+    def __reversed__(self):
+        if self._alive is None:
+            return iter(range(self._len - 1, -1, -1))
+        return super(MIFrozenStore, self).__reversed__()
+
+    def column(self, index):
+        'iterate through the values in the ``index`` (int) of all rows'
+        if self._alive is None:
+            return iter(self.columns[index])
+        return super(MIFrozenStore, self).column(index)
+
+    def clone(self):
+        'return a copy of the store (a frozen store is shared as it is)'
+        if self._alive is None:
+            return self
+        return super(MIFrozenStore, self).clone()
+
+    def share(self):
+        'see ``MIColumnStore.share()`` (a frozen store is shared as it is)'
+        if self._alive is None:
+            return self
+        return super(MIFrozenStore, self).share()
+
+    def positions(self):
+        'return the row ids in order (the positions once frozen)'
+        if self._alive is None:
+            return range(self._len)
+        return PositionIndex(self)
+
+
 #==============================================================================
 # IndexDict
 #==============================================================================
@@ -218,7 +968,7 @@ def convert_index_to_keys(d, item):
     to a single key or a list of keys.
     '''
 
-    keys = force_list(d.keys())
+    keys = IndexDict_keys(d)
     # use KeyError for compatibility of normal use
 
     # Warning: int item will be interpreted as the index rather than key!!
@@ -263,6 +1013,51 @@ def IndexDict_check_key_type(key):
         raise TypeError('Key must not be int or tuple or None: %s' % (key,))
 
 
+# types of ``item`` handled by flexible indexing rather than as a normal key
+_IndexDict_item_types = (int, tuple, list, slice, NoneType)
+
+
+def IndexDict_keys(d):
+    '''
+    Return the keys of ``d`` as a sequence for positional indexing.
+
+    If ``d`` is an IndexDict, the keys are kept in a ``PositionIndex`` cached
+    in ``d`` and maintained (or reset) by every method of IndexDict that adds
+    or removes keys, so that a key at a position and the position of a key
+    are found in O(log n) time. The returned sequence should not be modified.
+
+    Changing an IndexDict via the unbound methods of dict (e.g.,
+    ``dict.__setitem__(d, key, value)``) must be followed by
+    ``_IndexDict_reset_keys(d)``.
+    '''
+    if not isinstance(d, IndexDict):
+        return force_list(d.keys())
+    keys = d.__dict__.get('_keys')
+    if keys is None:
+        # use __dict__ directly to bypass AttrDict.__setattr__
+        keys = d.__dict__['_keys'] = PositionIndex(d.keys())
+    return keys
+
+
+def _IndexDict_add_key(d, key):
+    'Append a new ``key`` just set in IndexDict ``d`` to its cached keys'
+    keys = d.__dict__.get('_keys')
+    if keys is not None:
+        keys.append(key)
+
+
+def _IndexDict_remove_key(d, key):
+    'Remove a ``key`` just deleted from IndexDict ``d`` from its cached keys'
+    keys = d.__dict__.get('_keys')
+    if keys is not None:
+        keys.remove(key)
+
+
+def _IndexDict_reset_keys(d):
+    'Reset the cached keys of IndexDict ``d`` after its keys are reordered or replaced'
+    d.__dict__.pop('_keys', None)
+
+
 class IndexDict(dict):
     '''
     A dictionary that supports flexible indexing (get/set/delete) of
@@ -318,7 +1113,7 @@ class IndexDict(dict):
         'check key is valid'
         super(IndexDict, self).__init__()
         if args:
-            # if args[0] is an iterator (eg zip in PY3)
+            # if args[0] is an iterator (e.g., zip)
             # args[0] can only be iterated once
             for key, value in args[0]:
                 IndexDict_check_key_type(key)
@@ -329,6 +1124,8 @@ class IndexDict(dict):
         '''
         Get one or more items using flexible indexing.
         '''
+        if not isinstance(item, _IndexDict_item_types): # a normal key
+            return super(IndexDict, self).__getitem__(item)
         item2, single = convert_index_to_keys(self, item)
         super_getitem = super(IndexDict, self).__getitem__
         if single:
@@ -344,8 +1141,15 @@ class IndexDict(dict):
         only be used to change values of existing keys, rather than set values
         for new keys.
         '''
-        item2, single = convert_index_to_keys(self, item)
         super_setitem = super(IndexDict, self).__setitem__
+        if not isinstance(item, _IndexDict_item_types): # a normal key
+            is_new = not super(IndexDict, self).__contains__(item)
+            super_setitem(item, value)
+            if is_new:
+                _IndexDict_add_key(self, item)
+            return
+
+        item2, single = convert_index_to_keys(self, item)
         if single:
             super_setitem(item2, value)
         else:
@@ -354,21 +1158,78 @@ class IndexDict(dict):
                     'Number of keys (%s) based on argument %s does not match '
                     'number of values (%s)' % (len(item2), item, len(value)))
             map(IndexDict_check_key_type, item2)
-            return map(super_setitem, item2, value)
+            super_contains = super(IndexDict, self).__contains__
+            for key, v in zip(item2, value):
+                is_new = not super_contains(key)
+                super_setitem(key, v)
+                if is_new:
+                    _IndexDict_add_key(self, key)
 
     def __delitem__(self, item):
         '''
         Delete one or more items using flexible indexing.
         '''
-        item2, single = convert_index_to_keys(self, item)
-        super_delitem = super(IndexDict, self).__delitem__
-        if single:
-            return super_delitem(item2)
+        if not isinstance(item, _IndexDict_item_types): # a normal key
+            item2, single = item, True
         else:
-            return map(super_delitem, item2)
+            item2, single = convert_index_to_keys(self, item)
+        if single:
+            item2 = [item2]
+        super_delitem = super(IndexDict, self).__delitem__
+        for key in item2:
+            super_delitem(key)
+            _IndexDict_remove_key(self, key)
+
+    def pop(self, key, *default):
+        'Remove ``key`` and return its value (or ``default`` if not found).'
+        if len(default) > 1:
+            raise TypeError('pop expected at most 2 arguments, got %s' % (len(default) + 1))
+        # not via dict.pop: OrderedDict.pop may call self.__delitem__
+        if not super(IndexDict, self).__contains__(key):
+            if default:
+                return default[0]
+            raise KeyError(key)
+        value = super(IndexDict, self).__getitem__(key)
+        super(IndexDict, self).__delitem__(key)
+        _IndexDict_remove_key(self, key)
+        return value
+
+    def popitem(self, *args, **kw):
+        'Remove and return a (key, value) pair.'
+        key, value = super(IndexDict, self).popitem(*args, **kw)
+        _IndexDict_reset_keys(self) # the key may be the first or the last one
+        return key, value
+
+    def setdefault(self, key, default=None):
+        'Return the value of ``key``, setting it to ``default`` if not found.'
+        if super(IndexDict, self).__contains__(key):
+            return super(IndexDict, self).__getitem__(key)
+        self[key] = default
+        return default
+
+    def update(self, *args, **kw):
+        'Update the dictionary with the key/value pairs from ``args`` and ``kw``.'
+        super(IndexDict, self).update(*args, **kw)
+        _IndexDict_reset_keys(self)
+
+    def clear(self):
+        'Remove all items.'
+        super(IndexDict, self).clear()
+        _IndexDict_reset_keys(self)
+
+    def __reduce__(self):
+        'pickle (or copy) the items and the attributes, except the cached keys'
+        state = dict(self.__dict__)
+        state.pop('_keys', None) # not shared with the copy
+        return self.__class__, (), state or None, None, iter(self.items())
 
     def __contains__(self, item):
         'Check if the dictionary contains one or more items using flexible indexing.'
+        if not isinstance(item, _IndexDict_item_types): # a normal key
+            try:
+                return super(IndexDict, self).__contains__(item)
+            except TypeError: # unhashable
+                return False
         try:
             self.__getitem__(item)
             return True
@@ -387,6 +1248,11 @@ class IdxOrdDict(IndexDict, AttrDict, OrderedDict):
     IndexDict + AttrDict + OrderedDict
     '''
 
+    def move_to_end(self, key, last=True):
+        'Move an existing ``key`` to either end of the dictionary.'
+        super(IdxOrdDict, self).move_to_end(key, last)
+        _IndexDict_reset_keys(self)
+
 
 #==============================================================================
 # MIMapping
@@ -412,11 +1278,113 @@ class ValueExistsError(KeyError, MIMappingError):
         return 'Value {0!r} already exists in index #{1}: {2!r}'.format(*self.args)
 
 
+class DuplicateValuesError(ValueExistsError):
+    '''
+    Values appear more than once in the indices of a bulk operation, which
+    reports all the conflicts at once.
+
+    Usage::
+
+        DuplicateValuesError(conflicts) # list of (value, index_order, index_name)
+    '''
+
+    @property
+    def conflicts(self):
+        'list of ``(value, index_order, index_name)``'
+        return self.args[0]
+
+    def __str__(self):
+        """Get a string representation of this exception for use with str."""
+        return 'Duplicate values: ' + ', '.join(
+            '{0!r} in index #{1}: {2!r}'.format(*c) for c in self.conflicts)
+
+
 #==============================================================================
 
 
+class MISchema(object):
+    '''
+    An immutable description of the indices of a MIMapping, which is cached
+    by ``MI_get_schema()`` until the indices are changed (by ``_MI_init()``,
+    ``clear(True)`` or ``rename_index()``):
+
+    * ``names``: tuple of the index names
+    * ``positions``: dict of each index name to its position (int)
+    * ``dicts``: tuple of the internal index dicts (the first one is the MIMapping
+      itself; each other one maps the keys in that index to the row ids)
+    '''
+
+    __slots__ = ('names', 'positions', 'dicts', 'lookups')
+
+    def __init__(self, indices):
+        setattr = super(MISchema, self).__setattr__
+        setattr('names', tuple(indices.keys()))
+        setattr('positions', dict((name, i) for i, name in enumerate(self.names)))
+        setattr('dicts', tuple(d._index_d if isinstance(d, MIIndexView) else d
+                               for d in indices.values()))
+        setattr('lookups', {}) # cache of fast_lookup()
+
+    def __setattr__(self, name, value):
+        raise AttributeError('MISchema is immutable')
+
+    def __len__(self):
+        return len(self.names)
+
+    def key_to_index_single(self, key):
+        'convert an index name or int ``key`` to int'
+        try:
+            return self.positions[key]
+        except (KeyError, TypeError): # not a name
+            return _key_to_index_single(self.names, key)
+
+    def key_to_index(self, key):
+        'convert ``key`` of various types (see ``IndexDict``) to int or list of int'
+        try:
+            return self.positions[key]
+        except (KeyError, TypeError): # not a name
+            return _key_to_index(self.names, key)
+
+    def fast_lookup(self, index1):
+        '''
+        Return ``(getitem, get, rows, project)`` of a prepared lookup
+        ``d[index1:key]`` (with the default ``index2``, see ``MIAccessor``)
+        for exactly 2 indices, where the value of a key is never a list,
+        or ``()`` for other numbers of indices (including an empty
+        dictionary). The result is cached in ``lookups``.
+        '''
+        try:
+            return self.lookups[index1]
+        except KeyError:
+            lookup = ()
+            if len(self.names) == 2:
+                acc = MIAccessor(self.dicts[0], index1)
+                lookup = acc._getitem, acc._get, acc._rows, acc._project
+            self.lookups[index1] = lookup
+            return lookup
+
+
+def MI_get_schema(self):
+    'Return the cached ``MISchema`` of the indices of MIMapping ``self``'
+    schema = self._schema
+    if schema is None:
+        schema = self._schema = MISchema(self.indices)
+    return schema
+
+
+def _MI_set_indices(self, names, dicts):
+    '''
+    Set ``self.indices`` of MIMapping ``self`` from the index ``names`` and
+    the internal index ``dicts`` (the first one is ``self``), after its row
+    store is set.
+    '''
+    views = [self] + [MIIndexView(self, index_d) for index_d in dicts[1:]]
+    self.indices = IdxOrdDict(zip(names, views))
+    # reset last: setting an attribute may build the schema (e.g., via dir())
+    self._schema = None
+
+
 def MI_check_index_name(name):
-    'Check if index name is a valid str or unicode'
+    'Check if index name is a valid str or bytes'
     if not isinstance(name, string_types):
         raise TypeError('Index name must be a string. '
                         'Found type %s for %s' % (type(name), name))
@@ -470,12 +1438,12 @@ def MI_parse_args(self, args, ingore_index2=False, allow_new=False):
     * d[index1:key, index2_1, index2_2, ...] <==> d[index1:key, (index2_1, index2_2, ...)]
 
     '''
-    empty = len(self.indices) == 0
+    schema = MI_get_schema(self)
+    names = schema.names
+    empty = len(names) == 0
     if empty and not allow_new:
         raise KeyError('Item not found (dictionary is empty): %s' % (args,))
 
-    names = force_list(self.indices.keys())
-
     Nargs = len(args) if isinstance(args, tuple) else 1
 
     _default = object()
@@ -485,6 +1453,9 @@ def MI_parse_args(self, args, ingore_index2=False, allow_new=False):
         # easy handle of default logic (use continue/break as shortcut)
         for _ in (1,):
             if ingore_index2:
+                if isinstance(args[0], slice): # d[index1:key, index2]
+                    # slices are hashable in Python 3.12+: reject index2 explicitly
+                    raise TypeError('index2 is not allowed here, found: %s' % (args[1:],))
                 continue
 
             if isinstance(args[0], slice):
@@ -563,10 +1534,10 @@ def MI_parse_args(self, args, ingore_index2=False, allow_new=False):
         index1 = -1
 
     # index1 is always returned as an int
-    index1 = _key_to_index_single(names, index1)
+    index1 = schema.key_to_index_single(index1)
 
     try:
-        item = MI_get_item(self, key, index1)
+        item = self._rows[MI_get_rid(self, key, index1)] # not a copy: not changed
     except KeyError:
         if allow_new:  # new key for setitem; item_d = None
             item = None
@@ -588,7 +1559,7 @@ def MI_parse_args(self, args, ingore_index2=False, allow_new=False):
                 index2 = index2[0]
     else:
         # index2 is always returned as int or list of int
-        index2 = _key_to_index(names, index2)
+        index2 = schema.key_to_index(index2)
 
     if item is None:  # allow_new. item and value are None
         return index1, key, index2, None, None
@@ -621,20 +1592,518 @@ def mset_list(item, index, value):
 
 def MI_get_item(self, key, index=0):
     'return list of item'
-    index = _key_to_index_single(force_list(self.indices.keys()), index)
-    if index != 0:
-        key = self.indices[index][key]  # always use first index key
-    # key must exist
-    value = super(MIMapping, self).__getitem__(key)
-    N = len(self.indices)
-    if N == 1:
-        return [key]
-
-    if N == 2:
-        value = [value]
-    return [key] + value
+    index = MI_get_schema(self).key_to_index_single(index)
+    rid = MI_get_rid(self, key, index)
+    return list(self._rows[rid])  # copy
+
+
+def MI_get_rid(self, key, index=0):
+    'return the internal row id of ``key`` in the ``index`` (int)'
+    if index == 0:
+        # use super otherwise infinite loop of __getitem__
+        return super(MIMapping, self).__getitem__(key)
+    return MI_get_schema(self).dicts[index][key]
+
+
+def MI_get_positions(self):
+    '''
+    Return a ``PositionIndex`` of the row ids in the order of items.
+
+    It is built on first use and then maintained when items are added,
+    deleted or moved (or reset to None when the rows are replaced), so
+    that positional access of items takes O(log n) time.
+    '''
+    pos = self._pos
+    if pos is None:
+        pos = self._pos = self._rows.positions()
+    return pos
+
+
+def _MI_values_index(self, index=None):
+    '''
+    Convert the ``index`` of values to int or list of int, or None if there
+    are no values. See the notes for ``MIMapping.itervalues()``.
+    '''
+    schema = MI_get_schema(self)
+    if index is None:
+        N = len(schema)
+        if N <= 1:
+            return None
+        return 1 if N == 2 else force_list(range(1, N))
+    return schema.key_to_index(index)
+
+
+def MI_rows_values(self, rows, index=None):
+    '''
+    Iterate through values in the ``index`` of ``rows`` (lists of values in
+    all indices). See the notes for ``MIMapping.itervalues()``.
+    '''
+    index = _MI_values_index(self, index)
+    if index is None:
+        return
+    get_value = _row_getter(index) # a value or a tuple of values
+    for row in rows:
+        yield get_value(row)
+
+
+def MI_values_at(self, pos, index=None):
+    '''
+    Return the value in the ``index`` at the position ``pos`` (int) in the
+    order of items, or a list of values (slice).
+    See the notes for ``MIMapping.itervalues()``.
+    '''
+    rids = MI_get_positions(self)[pos]
+    index = _MI_values_index(self, index)
+    if index is None:
+        if isinstance(pos, slice):
+            return []
+        raise IndexError('No values in the index: %s' % (index,))
+    rows, project = self._rows.projection(index) # only read the values in index
+    if isinstance(pos, slice):
+        return [project(rows[rid]) for rid in rids]
+    return project(rows[rids])
+
+
+def _MI_contains_value(self, value, index=None):
+    '''
+    Return whether ``value`` is in the values of the ``index`` (see the notes
+    for ``MIMapping.itervalues()``) via a hash lookup in the index dict of
+    the (first) index, instead of a scan through all items.
+    '''
+    if not self.indices:
+        return False
+    index = _MI_values_index(self, index)
+    if index is None:
+        return False
+    dicts = MI_get_schema(self).dicts
+    try:
+        if isinstance(index, int):
+            return dict.__contains__(dicts[index], value)
+        if not isinstance(value, tuple) or len(value) != len(index):
+            return False # a tuple of values in index
+        if not index:
+            return len(self) > 0
+        rid = dict.get(dicts[index[0]], value[0])
+    except TypeError: # unhashable
+        return False
+    if rid is None:
+        return False
+    rows, project = self._rows.projection(index)
+    return project(rows[rid]) == value
+
+
+def MI_to_array(values):
+    'Convert a list of ``values`` to a NumPy array (NumPy is only required here)'
+    try:
+        import numpy
+    except ImportError:
+        raise ImportError('NumPy is required to return an array')
+    return numpy.array(values)
+
+
+def _MI_add_row(self, row):
+    'Add a new ``row`` (list of values in all indices) under a new row id'
+    rid = self._rows.append(row)
+    if self._pos is not None:
+        self._pos.append(rid)
+    OrderedDict.__setitem__(self, row[0], rid) # the internal dict of the first index
+    dicts = MI_get_schema(self).dicts
+    for i in range(1, len(dicts)):
+        dicts[i][row[i]] = rid
+
+
+def _MI_del_row(self, rid):
+    'Delete the row of ``rid`` and its values in all indices'
+    rows = self._rows
+    row = rows.pop(rid)
+    if self._pos is not None:
+        self._pos.remove(rid)
+    OrderedDict.__delitem__(self, row[0]) # the internal dict of the first index
+    dicts = MI_get_schema(self).dicts
+    for i in range(1, len(dicts)):
+        del dicts[i][row[i]]
+    if rows.holes:
+        _MI_compact(self)
+    return row
+
+
+def MI_find_duplicates(values, index_order, index_name):
+    'Return a list of ``(value, index_order, index_name)`` of each duplicate in ``values``'
+    seen, found = set(), set()
+    conflicts = []
+    for v in values:
+        if v in seen:
+            if v not in found:
+                found.add(v)
+                conflicts.append((v, index_order, index_name))
+        else:
+            seen.add(v)
+    return conflicts
+
+
+def _MI_load(self, rows=None, columns=None):
+    '''
+    Load ``rows`` (lists of values in all indices), or the ``columns``
+    (sequences of the values in each index) of the rows, into MIMapping
+    ``self`` which has indices but no items, building each index dict
+    directly in one pass instead of adding the rows one by one.
+
+    Return a list of conflicts ``(value, index_order, index_name)`` if any
+    index has duplicate values, in which case ``self`` is left empty.
+    '''
+    n = len(rows) if columns is None else len(columns[0]) if columns else 0
+    if n == 0:
+        return []
+    schema = MI_get_schema(self)
+    conflicts = []
+    loaded = False
+    try:
+        if columns is None:
+            rids = self._rows.extend(rows)
+            columns = zip(*rows)
+        else:
+            rids = self._rows.extend_columns(columns)
+        for i, column in enumerate(columns):
+            if i == 0:
+                map(super(MIMapping, self).__setitem__, column, rids)
+            else:
+                schema.dicts[i].update(zip(column, rids))
+            if len(schema.dicts[i]) != n: # check uniqueness by size
+                conflicts.extend(MI_find_duplicates(column, i, schema.names[i]))
+        if not conflicts:
+            self._pos = None
+            loaded = True
+    finally:
+        if not loaded:
+            _MI_clear_rows(self)
+    return conflicts
+
+
+def _MI_clear_rows(self):
+    'Remove all the rows of MIMapping ``self`` (keeping the indices)'
+    super(MIMapping, self).clear()
+    for index_d in MI_get_schema(self).dicts[1:]:
+        index_d.clear()
+    self._rows.clear()
+    self._pos = None
+
+
+def _MI_reload(self, rows):
+    'Replace all the rows of MIMapping ``self`` by ``rows`` (which must be valid)'
+    _MI_clear_rows(self)
+    _MI_load(self, rows)
+
+
+def _MI_compact(self):
+    '''
+    Remove the holes left by deleted rows in the row store of MIMapping
+    ``self`` once they outnumber the rows, which changes the row ids.
+    '''
+    rows = self._rows
+    if rows.holes > max(len(rows), 16):
+        _MI_reload(self, list(rows.values()))
+
+
+def _MI_copy(self):
+    '''
+    Return a shallow copy of MIMapping ``self`` by copying its internal
+    dicts and row store directly (the values are known to be unique).
+    '''
+    new = self.__class__()
+    if not self.indices:
+        return new
+    schema = MI_get_schema(self)
+    map(super(MIMapping, new).__setitem__, dict.keys(self), dict.values(self))
+    new._rows = self._rows.clone()
+    dicts = [new] + [new.index_class(index_d) for index_d in schema.dicts[1:]]
+    _MI_set_indices(new, schema.names, dicts)
+    return new
+
+
+def _MI_freeze(self):
+    '''
+    Freeze the ``MIFrozenStore`` (if any) of immutable MIMapping ``self``
+    once its items are loaded, removing the holes left by deleted rows first.
+    An empty store is left unfrozen to load items later (see ``from_rows()``).
+    '''
+    rows = self._rows
+    if isinstance(rows, MIFrozenStore) and len(rows):
+        if rows.holes:
+            _MI_reload(self, list(rows.values()))
+        rows.freeze()
+        self._pos = None
+        self._schema = None # the columns are replaced
+
+
+def _MI_unshare(self, index=None, empty=False):
+    '''
+    Before a change of MIMapping ``self`` after ``snapshot()``, copy only
+    the parts shared with the snapshots which are about to change: the
+    index dicts (and the columns of ``MIColumnStore``) of the indices in
+    ``index`` (list of int) whose values are changed, or of all indices if
+    ``index`` is None (e.g., when items are added or deleted). The other
+    index dicts stay shared until they are changed.
+
+    The row store is replaced on the first change by a store sharing the
+    rows (or columns) with the snapshots (see ``MIRowStore.share()``).
+    If ``empty``, all the shared parts are replaced by empty ones.
+    '''
+    schema = MI_get_schema(self)
+    shared = self._shared
+    replaced = empty or self._shared_rows
+    if empty:
+        self._rows = self._rows.__class__(len(schema))
+        parts = set(shared)
+    else:
+        if self._shared_rows:
+            self._rows = self._rows.share()
+        if self._rows.own(index):
+            replaced = True
+        parts = set(shared) if index is None else shared.intersection(index)
+    self._shared_rows = False
+    for i in parts:
+        if i: # the first index is the dict of self, never shared
+            index_d = schema.dicts[i]
+            index_d = self.index_class() if empty else self.index_class(index_d)
+            self.indices[schema.names[i]] = MIIndexView(self, index_d)
+            replaced = True
+    shared.difference_update(parts)
+    if replaced: # keep the schema (and the fast paths) if nothing is replaced
+        self._schema = None
+
+
+def _MI_deepcopy(self, memo):
+    '''
+    Return a deep copy of MIMapping ``self``. Values of atomic types (see
+    ``atomic_types``) are shared instead of copied: if all values are
+    atomic, it is as fast as a shallow copy.
+    '''
+    if self.indices:
+        rows = self._rows
+        types = set()
+        for i in range(len(self.indices)):
+            types.update(imap(type, rows.column(i)))
+        atomic = types.issubset(atomic_types)
+    else:
+        atomic = True
+    if atomic:
+        new = _MI_copy(self)
+    else:
+        items = [[v if type(v) in atomic_types else deepcopy(v, memo) for v in row]
+                 for row in self._rows.values()]
+        new = self.__class__(items, force_list(self.indices.keys()))
+    memo[id(self)] = new
+    for k, v in vars(self).items(): # additional state/__dict__
+        if k not in vars(new):
+            vars(new)[k] = deepcopy(v, memo)
+    return new
+
+
+def _MI_default_attrs(cls, _cache={}):
+    'names of the normal attributes of a new instance of MIMapping ``cls``'
+    try:
+        return _cache[cls]
+    except KeyError:
+        attrs = _cache[cls] = frozenset(vars(cls()))
+        return attrs
+
+
+def _MI_pack_column(column):
+    '''
+    Pack a ``column`` (list of values) for pickle protocol 5: a column of
+    only int (of 64 bits) or only float values is packed as a tuple
+    ``(typecode, byteorder, PickleBuffer)`` of an array, which is pickled
+    as raw bytes (or passed out-of-band via ``buffer_callback``).
+    '''
+    types = set(imap(type, column))
+    if len(types) == 1:
+        typecode = {int: 'q', float: 'd'}.get(types.pop())
+        if typecode:
+            try:
+                values = array.array(typecode, column)
+            except OverflowError:
+                return column
+            return typecode, sys.byteorder, pickle.PickleBuffer(values)
+    return column
+
+
+def _MI_unpack_column(column):
+    'Unpack a ``column`` packed by ``_MI_pack_column()`` to a list of values'
+    if isinstance(column, tuple):
+        typecode, byteorder, buffer = column
+        values = array.array(typecode)
+        values.frombytes(memoryview(buffer).cast('B'))
+        if byteorder != sys.byteorder:
+            values.byteswap()
+        column = values.tolist()
+    return column
+
+
+def _MI_unpickle(cls, names, columns):
+    '''
+    Rebuild a MIMapping of ``cls`` from the index ``names`` and the ``columns``
+    of its items (see ``MIMapping.__reduce_ex__()``), loading the index dicts
+    directly instead of adding the items one by one.
+    '''
+    d = cls([], names)
+    conflicts = _MI_load(d, columns=[_MI_unpack_column(c) for c in columns])
+    if conflicts:
+        raise DuplicateValuesError(conflicts)
+    _MI_freeze(d)
+    return d
+
+
+def _MI_select_indices(self, index):
+    '''
+    Keep only the indices in ``index`` (list of int) in that order, in place.
+    The values are already unique and the row ids stay the same, so only
+    the index dicts and the values in the rows are reordered (or dropped).
+    '''
+    schema = MI_get_schema(self)
+    dicts = list(schema.dicts)
+    if index[0] != 0: # swap the first index with an existing index dict
+        if 0 in index:
+            dicts[0] = self.index_class(dict.items(self)) # the internal dict
+        new_first = dicts[index[0]]
+        super(MIMapping, self).clear()
+        map(super(MIMapping, self).__setitem__, new_first.keys(), new_first.values())
+        dicts[index[0]] = self
+    self._rows.reorder(index)
+    _MI_set_indices(self, mget_list(schema.names, index), mget_list(dicts, index))
+
+
+def _MI_unique_rows(rows, last=True, index=0):
+    '''
+    Remove the rows with duplicate keys in ``index`` (int), keeping the
+    last (or first if ``last==False``) row of each key at the position of
+    the first one (like a normal dict).
+    '''
+    positions = {}
+    unique_rows = []
+    for row in rows:
+        pos = positions.setdefault(row[index], len(unique_rows))
+        if pos == len(unique_rows):
+            unique_rows.append(row)
+        elif last:
+            unique_rows[pos] = row
+    return unique_rows
+
+
+def _MI_merge(self, rows, unique=False, index=0, deleted=()):
+    '''
+    Merge ``rows`` (sequences of values in all indices) into MIMapping ``self``
+    with indices: rows of existing keys in ``index`` (int) update the items
+    in place, and the other rows are added as new items. The items of the
+    row ids ``deleted`` (a set) are deleted first, and their values may be
+    reused by ``rows``.
+
+    The whole batch is validated against the existing items before any change,
+    and all the duplicate values are reported at once in ``DuplicateValuesError``.
+    Values may be swapped between the updated items.
+
+    ``unique=True`` skips checking the uniqueness of ``rows`` themselves
+    (e.g., the rows of another MIMapping).
+    '''
+    if not unique:
+        rows = _MI_unique_rows(rows, index=index)
+    schema = MI_get_schema(self)
+    names = schema.names
+    # the internal dict of the first index is accessed via super()
+    dicts = (super(MIMapping, self),) + schema.dicts[1:]
+    others = [i for i in range(len(names)) if i != index]
+    get_rid = dicts[index].get
+    rids = [get_rid(row[index]) for row in rows] # None for new keys
+    updated = set(rids)
+    updated.discard(None)
+    free = updated.union(deleted) # row ids whose values may be reused
+
+    conflicts = []
+    for i in others:
+        get = dicts[i].get
+        column = [row[i] for row in rows]
+        if not unique and len(set(column)) != len(column):
+            conflicts.extend(MI_find_duplicates(column, i, names[i]))
+        for v in column:
+            rid = get(v)
+            if rid is not None and rid not in free:
+                conflicts.append((v, i, names[i]))
+    if conflicts:
+        raise DuplicateValuesError(conflicts)
+
+    if deleted:
+        _MI_del_rows(self, deleted)
+        rids = [get_rid(row[index]) for row in rows] # may be changed by _MI_compact()
+
+    existing = self._rows
+    setters = [index_d.__setitem__ for index_d in dicts]
+    deleters = [index_d.__delitem__ for index_d in dicts]
+    # remove all the replaced values first, which may be reused by other rows
+    for rid, row in zip(rids, rows):
+        if rid is not None:
+            old_row = existing[rid]
+            for i in others:
+                if old_row[i] != row[i]:
+                    deleters[i](old_row[i])
+    set_value = existing.set_value
+    for rid, row in zip(rids, rows):
+        if rid is None:
+            _MI_add_row(self, list(row))
+        else:
+            old_row = existing[rid]
+            for i in others:
+                if old_row[i] != row[i]: # skip the unchanged values
+                    setters[i](row[i], rid)
+                    set_value(rid, i, row[i])
 
 
+def _MI_del_rows(self, rids):
+    '''
+    Delete the rows of ``rids`` (unique row ids) and their values in all
+    indices, in one pass.
+    '''
+    if not rids:
+        return
+    dicts = (super(MIMapping, self),) + MI_get_schema(self).dicts[1:]
+    deleters = [index_d.__delitem__ for index_d in dicts]
+    pop = self._rows.pop
+    if len(rids) * 4 > len(self._rows):
+        self._pos = None # cheaper to rebuild than to remove one by one
+    pos = self._pos
+    for rid in rids:
+        row = pop(rid)
+        if pos is not None:
+            pos.remove(rid)
+        for delete, v in zip(deleters, row):
+            delete(v)
+    _MI_compact(self)
+
+
+def _MI_diff(self, other):
+    '''
+    Return the patch from MIMapping ``self`` to MIMapping ``other`` with the
+    same indices (see ``MIMapping.diff()``). The rows (as tuples) of both
+    are compared as sets, so only the different rows are handled one by one.
+    '''
+    names = force_list(self.indices.keys())
+    if names != force_list(other.indices.keys()):
+        raise ValueError('Index names do not match: %s and %s' %
+                         (names, force_list(other.indices.keys())))
+    patch = {'added': [], 'removed': [], 'changed': []}
+    if not names:
+        return patch
+    whole = force_list(range(len(names)))
+    old_rows = set(self._rows.zip_columns(whole))
+    new_rows = set(other._rows.zip_columns(whole))
+    new_rows, old_rows = new_rows - old_rows, old_rows - new_rows
+    new_rows = dict((row[0], row) for row in new_rows)
+    old_keys = set(row[0] for row in old_rows)
+    # keep the order of the keys in self (removed) or other (added and changed)
+    for key in filter(new_rows.__contains__, other):
+        patch['changed' if key in old_keys else 'added'].append(new_rows[key])
+    old_keys.difference_update(new_rows)
+    patch['removed'] = force_list(filter(old_keys.__contains__, self))
+    return patch
+
 
 def od_replace_key(od, key, new_key, *args, **kw):
     '''
@@ -685,44 +2154,33 @@ def od_replace_key(od, key, new_key, *args, **kw):
     if new_key in od: # new_key overwrites another existing key
         OrderedDict.__delitem__(od, new_key)
 
-    if PY2:
-        # modify internal variables
-        _map = od._OrderedDict__map
-        link = _map[key]
-        link[2] = new_key
-        del _map[key]
-        _map[new_key] = link
-        val = dict.pop(od, key)
-        if args:
-            val = value
-        dict.__setitem__(od, new_key, val)
+    # OrderedDict is implemented in C: no access to its private links
+    found = False
+    keys = [] # keys after key
+    for k in od:
+        if k == key:
+            found = True
+            continue
+        if found:
+            keys.append(k)
+    # warning: can not use OrderedDict.pop, which calls del self[key]
+    getitem = dict.__getitem__
+    setitem = OrderedDict.__setitem__
+    delitem = OrderedDict.__delitem__
+    v = getitem(od, key)
+    delitem(od, key)
+    if args:
+        v = value
+    setitem(od, new_key, v)
+    # shift keys to after new_key
+    for k in keys:
+        # od[k] = od.pop(k) # can not call this directly in MIDict
+        v = getitem(od, k)
+        delitem(od, k)
+        setitem(od, k, v)
 
-    else:
-        # in PY3, OrderedDict is implemented in C
-        # no access to private variables __map
-        found = False
-        keys = [] # keys after key
-        for k in od:
-            if k == key:
-                found = True
-                continue
-            if found:
-                keys.append(k)
-        # warning: can not use OrderedDict.pop, which calls del self[key]
-        getitem = dict.__getitem__
-        setitem = OrderedDict.__setitem__
-        delitem = OrderedDict.__delitem__
-        v = getitem(od, key)
-        delitem(od, key)
-        if args:
-            v = value
-        setitem(od, new_key, v)
-        # shift keys to after new_key
-        for k in keys:
-            # od[k] = od.pop(k) # can not call this directly in MIDict
-            v = getitem(od, k)
-            delitem(od, k)
-            setitem(od, k, v)
+    if isinstance(od, IndexDict):
+        _IndexDict_reset_keys(od)
 
 
 def od_reorder_keys(od, keys_in_new_order): # not used
@@ -765,9 +2223,12 @@ def _MI_setitem(self, args, value):
         return
 
     index1, key, index2, item, old_value = MI_parse_args(self, args, allow_new=True)
-    names = force_list(indices.keys())
     is_new_key = item is None
     single = isinstance(index2, int)
+    if self._shared: # shared with a snapshot: copy the indices to change
+        _MI_unshare(self, None if is_new_key else [index2] if single else index2)
+    schema = MI_get_schema(self)
+    names, dicts = schema.names, schema.dicts
 
     if single:
         index2_list = [index2]
@@ -795,7 +2256,7 @@ def _MI_setitem(self, args, value):
     # check duplicate values
     for i, v, old_v in zip(index2_list, value, old_value):
         # index2_list may contain index1; not allow duplicate value for index1 either
-        if v in indices[i]:
+        if v in dicts[i] if i else super(MIMapping, self).__contains__(v):
             if is_new_key or v != old_v:
                 raise ValueExistsError(v, i, names[i])
 
@@ -808,31 +2269,33 @@ def _MI_setitem(self, args, value):
         # index2_list may also override index1
         d.update(zip(index2_list, value))
         values = [d[i] for i in range(N)]  # reorder based on the indices
-        key = values[0]
-        val = values[1] if len(values) == 2 else values[1:]
-        super(MIMapping, self).__setitem__(key, val)
-        for i, v in zip(names[1:], values[1:]):
-            indices[i][v] = key
+        _MI_add_row(self, values)
 
     else: # not new key
-#        import pdb;pdb.set_trace()
-        key1 = item[0]
+        # the row id is stable, so changing any value (including the key
+        # in the first index) keeps the order of the item in O(1)
+        rid = MI_get_rid(self, item[0])
+        set_value = self._rows.set_value
         item2 = list(item)  # copy item first
         mset_list(item2, index2_list, value) # index2_list may also override index1
-        key2 = item2[0]
-        val = item2[1] if len(item2) == 2 else item2[1:]
-        if key1 == key2:
-            super(MIMapping, self).__setitem__(key1, val)
-        else:
-            od_replace_key(self, key1, key2, val)
-
-        for i, v_old, v_new in zip(names[1:], item[1:], item2[1:]):
-            od_replace_key(indices[i], v_old, v_new, key2)
+        for i, index_d in enumerate(dicts):
+            v_old, v_new = item[i], item2[i]
+            if v_old != v_new:
+                if i == 0:
+                    super(MIMapping, self).__delitem__(v_old)
+                    super(MIMapping, self).__setitem__(v_new, rid)
+                else:
+                    del index_d[v_old]
+                    index_d[v_new] = rid
+                set_value(rid, i, v_new)
 
 
-def _MI_init(self, *args, **kw):
+def _MI_parse_init_args(args, kw):
     '''
-    Separate __init__ function of MIMapping
+    Parse the arguments ``(items, names, **kw)`` of ``_MI_init()``.
+
+    Return ``(items, names, n_index)``, where each item is a sequence of
+    values in all indices.
     '''
 
     items, names = [], None
@@ -890,14 +2353,48 @@ def _MI_init(self, *args, **kw):
     else:
         map(MI_check_index_name, names)
 
+    return items, names, n_index
+
+
+def _MI_init(self, *args, **kw):
+    '''
+    Separate __init__ function of MIMapping
+    '''
+    columns = None
+    source = args[0] if args else None
+    if isinstance(source, MIMapping) and source.indices and not kw:
+        # load the columns of the source directly, whose values are unique
+        items, names, n_index = _MI_parse_init_args(([],) + args[1:], kw)
+        if len(args) < 2 or args[1] is None:
+            names = force_list(source.indices.keys())
+        if len(names) != len(source.indices):
+            raise ValueError('Length of names (%s) does not match '
+                             'length of items (%s)' % (len(names), len(source.indices)))
+        rows = source._rows
+        columns = [force_list(rows.column(i)) for i in range(len(names))]
+    else:
+        items, names, n_index = _MI_parse_init_args(args, kw)
+
     self.indices = d = IdxOrdDict() # the internal dict
+    self._rows = self.store_class(len(names)) # row id -> list of values in all indices
+    self._pos = None # PositionIndex of row ids, built on first use
     for index in names:
         if index in d:
             raise ValueError('Duplicate index name: %s in %s' % (index, names))
-        d[index] = AttrOrdDict()
+        d[index] = MIIndexView(self, self.index_class())
 
-    if n_index > 0:
+    if d:
         d[0] = self
+    # MISchema of the indices, built on first use: reset once the indices are
+    # complete since setting the attributes above may build it (e.g., via dir())
+    self._schema = None
+
+    if columns is not None:
+        _MI_load(self, columns=columns)
+    elif n_index > 0:
+        if not _MI_load(self, [list(item) for item in items]):
+            return
+        # duplicate values exist: add the items one by one
         for item in items:
             primary_key = item[0]
             if n_index == 1:
@@ -911,18 +2408,6 @@ def _MI_init(self, *args, **kw):
 
 
 
-def MI_method_PY3(cls):
-    '''class decorator to change MIMapping method names for PY3 compatibility'''
-
-    nmspc = cls.__dict__.copy()
-    for m in ['__cmp__', 'has_key']:
-        nmspc.pop(m)
-    methods = ['keys', 'values', 'items']
-    for m in methods:
-        nmspc[m] = nmspc.pop('view' + m)
-    return type(cls)(cls.__name__, cls.__bases__, nmspc)
-
-
 class MIMapping(AttrOrdDict):
     '''
     Base class for all provided multi-index dictionary (MIDict) types.
@@ -933,6 +2418,12 @@ class MIMapping(AttrOrdDict):
 
     '''
 
+    # class of the storage of items: MIRowStore (default) or MIColumnStore
+    store_class = MIRowStore
+    # class of the dicts of the indices other than the first one (value -> row id),
+    # which need no order since the items are iterated through the row store
+    index_class = AttrDict
+
     def __init__(self, *args, **kw):
         '''
         Init dictionary with items and index names::
@@ -943,7 +2434,7 @@ class MIMapping(AttrOrdDict):
 
         ``names`` and ``kw`` are optional.
 
-        ``names`` must all be str or unicode type.
+        ``names`` must all be str or bytes.
         When ``names`` not present, index names default to: 'index_0', 'index_1', etc.
         When keyword arguments present, only two indices allowed (like a normal dict)
 
@@ -969,8 +2460,13 @@ class MIMapping(AttrOrdDict):
         '''
 
 
-        # assign attr `indices` before calling super's __init__()
+        # assign attrs before calling super's __init__()
         self.indices = None  # will be used as the internal dict
+        self._rows = None  # will be used as the internal storage of items
+        self._pos = None
+        self._schema = None
+        self._shared = set() # positions of the indices shared with snapshots
+        self._shared_rows = False # the row store is shared with snapshots
 
         super(MIMapping, self).__init__()
 
@@ -981,6 +2477,22 @@ class MIMapping(AttrOrdDict):
         '''
         get values via multi-indexing
         '''
+        schema = self._schema
+        if schema is not None: # fast paths of d[key] and d[index1:key]
+            try:
+                if not isinstance(args, (tuple, slice)):
+                    lookup = schema.lookups.get(0) or schema.fast_lookup(0)
+                    if lookup:
+                        getitem, get, rows, project = lookup
+                        return project(rows[getitem(args)])
+                elif isinstance(args, slice) and args.step is None:
+                    index1 = -1 if args.start is None else args.start
+                    lookup = schema.fast_lookup(index1)
+                    if lookup:
+                        getitem, get, rows, project = lookup
+                        return project(rows[getitem(args.stop)])
+            except (KeyError, TypeError): # raise the error via the full parsing
+                pass
 
         return MI_parse_args(self, args)[-1]
 
@@ -1018,18 +2530,29 @@ class MIMapping(AttrOrdDict):
             if len(self.indices) not in [0,2]:
                 return False # indices not equal
 
-        eq = super(MIMapping, self).__eq__(other)
-
-        if not eq:
+        if len(self) != len(other):
             return False
 
+        # the internal dict maps keys to row ids, so compare the items instead
         if is_MIMapping:
-            eq = force_list(self.indices.keys()) == force_list(other.indices.keys())
+            if MI_get_schema(self).names != MI_get_schema(other).names:
+                return False
+            fp, fp_other = self._rows._fp, other._rows._fp
+            if fp is not None and fp_other is not None and fp != fp_other:
+                return False # different rows (see fingerprint())
+            return force_list(self._rows.values()) == force_list(other._rows.values())
 
-        return eq # ignore indices
+        if isinstance(other, OrderedDict): # order-sensitive
+            return force_list(self.items()) == force_list(other.items())
 
+        _missing = object()
+        for key, value in self.items():
+            if other.get(key, _missing) != value:
+                return False
+        return True
 
-    def __ne__(self, other): # PY2: inherited from OrderedDict
+
+    def __ne__(self, other): # not the one of OrderedDict (which compares the row ids)
         return not self == other
 
 
@@ -1039,25 +2562,11 @@ class MIMapping(AttrOrdDict):
 
         If ``other`` is not a Mapping type, return NotImplemented.
 
-        If ``other`` is a Mapping type, compare in the following order:
-            * convert ``self`` to an OrderedDict or a dict (depends on the type of ``other``)
-              and compare it with ``other``
-            * index names (only if ``other`` is a MIMapping)
-
+        Mappings are not ordered: raise TypeError if ``other`` is a Mapping.
         '''
         if not isinstance(other, Mapping):
             return NotImplemented
-
-        if PY2:
-            cp = super(MIMapping, self).__cmp__(other) # Python2
-            if cp < 0:
-                return True
-            if cp == 0:
-                if isinstance(other, MIMapping):
-                    return force_list(self.indices.keys()) < force_list(other.indices.keys())
-            return False
-        else: # PY3
-            raise TypeError('unorderable types %r < %r' % (self, other))
+        raise TypeError('unorderable types %r < %r' % (self, other))
 
 
     # use __lt__
@@ -1074,14 +2583,6 @@ class MIMapping(AttrOrdDict):
         'self >= other'
         return not self < other
 
-    def __cmp__(self, other):
-        # gone in PY3
-        'Return negative if self < other, zero if self == other, positive if self > other.'
-        # warning: "<" causes recursion of __cmp__
-#        if self < other:
-#            return -1
-        return NotImplemented
-
     def __repr__(self, _repr_running={}):
         'repr as "MIDict(items, names)"'
         call_key = id(self), _get_ident()
@@ -1101,18 +2602,69 @@ class MIMapping(AttrOrdDict):
         finally:
             del _repr_running[call_key]
 
-    def __reduce__(self):
-        'Return state information for pickling'
-        items = force_list(self.items())
+    def __reduce_ex__(self, protocol):
+        '''
+        Return state information for pickling: the index names and a list
+        of the values in each index, from which the index dicts are built
+        directly (see ``_MI_unpickle()``). With protocol 5, columns of int
+        or float values are pickled as raw buffers (see ``_MI_pack_column()``).
+        '''
         names = force_list(self.indices.keys())
-        inst_dict = vars(self).copy() # additional state/__dict__
-        for k in vars(self.__class__()):
-            inst_dict.pop(k, None)
-        return self.__class__, (items, names), inst_dict
+        rows = self._rows
+        columns = [force_list(rows.column(i)) for i in range(len(names))]
+        if protocol >= 5 and hasattr(pickle, 'PickleBuffer'):
+            columns = map(_MI_pack_column, columns)
+        defaults = _MI_default_attrs(self.__class__)
+        inst_dict = dict((k, v) for k, v in vars(self).items() # additional state/__dict__
+                         if k not in defaults)
+        return _MI_unpickle, (self.__class__, names, columns), inst_dict or None
+
+    def __reduce__(self):
+        return self.__reduce_ex__(2)
 
     def copy(self):
         'a shallow copy'
-        return self.__class__(self)
+        return _MI_copy(self)
+
+    def diff(self, other):
+        '''
+        Return the differences from the items of ``self`` to the items of
+        ``other`` (a MIMapping with the same index names), matched by the keys
+        in the first index, as a patch (see ``MIDict.apply_patch()``)::
+
+            {'added': [rows of the keys only in other],
+             'removed': [keys only in self],
+             'changed': [rows of other of the keys with different values]}
+
+        where each row is a tuple of the values in all indices (like ``items()``)::
+
+            d1 = MIDict([['jack', 1], ['tony', 2]], ['name', 'uid'])
+            d2 = MIDict([['jack', 3], ['alice', 2]], ['name', 'uid'])
+            d1.diff(d2) -> {'added': [('alice', 2)], 'removed': ['tony'],
+                            'changed': [('jack', 3)]}
+            d1.apply_patch(d1.diff(d2)) # d1 == d2 (except the order of items)
+
+        The rows are compared as sets, so that only the different rows are
+        handled one by one.
+        '''
+        return _MI_diff(self, other)
+
+    def fingerprint(self):
+        '''
+        Return a fingerprint (an int) of the items, which does not depend on
+        the order of the items or the index names: equal dictionaries have
+        equal fingerprints.
+
+        It is computed on first use and then maintained when the items are
+        changed, so that comparing dictionaries whose fingerprints are known
+        (including hashed ``FrozenMIDict``) rejects unequal ones at once.
+        '''
+        return self._rows.fingerprint()
+
+    __copy__ = copy
+
+    def __deepcopy__(self, memo):
+        return _MI_deepcopy(self, memo)
 
 #    def __sizeof__(self):
 #        'not accurate.. '
@@ -1145,6 +2697,51 @@ class MIMapping(AttrOrdDict):
         items = [[keys[0], value]] if N == 1 else []
         return cls(items, names)
 
+    @classmethod
+    def from_rows(cls, rows, names=None, on_duplicate='raise'):
+        '''
+        Create a new dictionary from ``rows`` (each row is a list of values in
+        all indices) in bulk, which is much faster than adding the rows one by one.
+
+        Optional ``names`` can be provided for index names.
+
+        ``on_duplicate`` handles duplicate keys in the first index:
+
+        * ``'raise'``: raise ``DuplicateValuesError``
+        * ``'first'``: keep the first row of the key
+        * ``'last'``: keep the last row of the key (at the position of the
+          first one, like a normal dict)
+
+        Duplicate values in other indices always raise ``DuplicateValuesError``,
+        which reports all the conflicts at once.
+        '''
+        if on_duplicate not in ('raise', 'first', 'last'):
+            raise ValueError('on_duplicate must be "raise", "first" or "last" '
+                             '(got %r)' % (on_duplicate,))
+        rows = [list(row) for row in rows]
+        if not rows:
+            return cls([], names)
+
+        n_index = len(rows[0])
+        for row in rows[1:]:
+            if len(row) != n_index:
+                raise ValueError('Length of all rows must equal')
+        if names is None:
+            names = ['index_%s' % (i+1) for i in range(n_index)]
+        elif len(names) != n_index:
+            raise ValueError('Length of names (%s) does not match '
+                             'length of rows (%s)' % (len(names), n_index))
+
+        if on_duplicate != 'raise':
+            rows = _MI_unique_rows(rows, last=on_duplicate == 'last')
+
+        d = cls([], names)
+        conflicts = _MI_load(d, rows)
+        if conflicts:
+            raise DuplicateValuesError(conflicts)
+        _MI_freeze(d)
+        return d
+
     def get(self, key, default=None):
         '''
         Return the value for ``key`` if ``key`` is in the dictionary, else ``default``.
@@ -1153,6 +2750,13 @@ class MIMapping(AttrOrdDict):
 
         Support "multi-indexing" keys
         '''
+        schema = self._schema
+        if schema is not None and not isinstance(key, (tuple, slice)):
+            lookup = schema.fast_lookup(0)
+            if lookup: # fast path of a normal key
+                getitem, get, rows, project = lookup
+                rid = get(key)
+                return default if rid is None else project(rows[rid])
         try:
             return self[key]
         except KeyError:
@@ -1164,25 +2768,52 @@ class MIMapping(AttrOrdDict):
 
         Support "multi-indexing" keys
         '''
+        if not isinstance(key, (tuple, slice)): # a normal key
+            try:
+                return dict.__contains__(self, key)
+            except TypeError: # unhashable
+                return False
         try:
             MI_parse_args(self, key, ingore_index2=True, allow_new=False)
             return True
         except Exception:
             return False
 
-    def has_key(self, key):
+    ############################################
+
+    # inherited methods from OrderedDict:
+    # setdefault
+
+    def pop(self, key, *default):
         '''
-        Test for the presence of ``key`` in the dictionary. has_key() is deprecated
-        in favor of ``key in d``.
+        Remove ``key`` (and the whole item) and return its value ``d[key]``.
+        If ``key`` is not found, return ``default`` if given, otherwise raise
+        KeyError.
 
         Support "multi-indexing" keys
         '''
-        return self.__contains__(key)
-
-    ############################################
+        if len(default) > 1:
+            raise TypeError('pop expected at most 2 arguments, got %s' % (len(default) + 1))
+        try:
+            value = self[key]
+        except KeyError:
+            if default:
+                return default[0]
+            raise
+        del self[key]
+        return value
 
-    # inherited methods from OrderedDict:
-    # pop, popitem, setdefault
+    def popitem(self, last=True):
+        '''
+        Remove and return a (key, value) pair. Pairs are returned in LIFO
+        order if ``last`` is true or FIFO order if false.
+        '''
+        if not self:
+            raise KeyError('dictionary is empty')
+        key = next(reversed(self) if last else iter(self))
+        value = self[key]
+        del self[key]
+        return key, value
 
     def __iter__(self, index=None):
         'Iterate through keys in the ``index`` (defaults to the first index)'
@@ -1190,17 +2821,13 @@ class MIMapping(AttrOrdDict):
         if self.indices:
             if index is None:
                 index = 0
-            if index == 0:
-                # use super otherwise infinite loop of __iter__
-                for x in super(MIMapping, self).__iter__():
-                    yield x
-            else:
-                for x in self.indices[index]:
-                    yield x
+            index = MI_get_schema(self).key_to_index_single(index)
+            # the order of items is kept by the row store
+            return self._rows.column(index)
 
-        else:
-            if index is not None:
-                raise KeyError('Index not found (dictionary is empty): %s' % (index,))
+        if index is not None:
+            raise KeyError('Index not found (dictionary is empty): %s' % (index,))
+        return iter(())
 
 
     def __reversed__(self, index=None):
@@ -1208,13 +2835,11 @@ class MIMapping(AttrOrdDict):
         if self.indices:
             if index is None:
                 index = 0
-            if index == 0:
-                # use super otherwise infinite loop of __iter__
-                for x in super(MIMapping, self).__reversed__(): # from OrderedDict
-                    yield x
-            else: # OrderedDict reverse
-                for x in reversed(self.indices[index]):
-                    yield x
+            index = MI_get_schema(self).key_to_index_single(index)
+            rows = self._rows
+            get_value = rows.get_value
+            for rid in reversed(rows):
+                yield get_value(rid, index)
         else:
             if index is not None:
                 raise KeyError('Index not found (dictionary is empty): %s' % (index,))
@@ -1222,12 +2847,7 @@ class MIMapping(AttrOrdDict):
 
     def iterkeys(self, index=None):
         'Iterate through keys in the ``index`` (defaults to the first index)'
-        for x in self.__iter__(index):
-            yield x
-
-    def keys(self, index=None):
-        'Return a copy list of keys in the ``index`` (defaults to the first index)'
-        return list(self.iterkeys(index))
+        return self.__iter__(index)
 
     def itervalues(self, index=None):
         '''
@@ -1239,49 +2859,28 @@ class MIMapping(AttrOrdDict):
             * if N <= 1: return
             * if N == 2: yield values in the 2nd index
             * if N > 2: yield values in all indices except the first index
-              (each value is a list of ``N-1`` elements)
-        '''
-        N = len(self.indices)
+              (each value is a tuple of ``N-1`` elements)
 
-        if index is None:
-            if N <= 1:
-                return
-            elif N == 2:
-                index = 1
-                single = True
-            else:
-                index = slice(1, None)
-                single = False
-        else:
-            index, single = convert_key_to_index(force_list(self.indices.keys()), index)
-
-        multi = not single
-
-        for key in self:
-            item = MI_get_item(self, key)
-            value = mget_list(item, index)
-            if multi:
-                value = tuple(value)  # convert list to tuple
-            yield value
-
-    def values(self, index=None):
-        '''
-        Return a copy list of values in the ``index``.
-
-        See the notes for ``itervalues()``
+        If ``index`` is a list of indices, yield a tuple of the values in these
+        indices for each item, like ``zip(d.itervalues(i1), d.itervalues(i2), ...)``
+        but reading the items in a single pass.
         '''
-        return list(self.itervalues(index))
+        if not self.indices:
+            if index is not None:
+                MI_get_schema(self).key_to_index(index) # raise KeyError
+            return iter(())
+        index = _MI_values_index(self, index)
+        if index is None:
+            return iter(())
+        if isinstance(index, int): # read a single column
+            return self._rows.column(index)
+        return self._rows.zip_columns(index)
 
     def iteritems(self, indices=None):
         'Iterate through items in the ``indices`` (defaults to all indices)'
         if indices is None:
-            indices = force_list(self.indices.keys())
-        for x in self.itervalues(indices):
-            yield x
-
-    def items(self, indices=None):
-        'Return a copy list of items in the ``indices`` (defaults to all indices)'
-        return force_list(self.iteritems(indices))
+            indices = force_list(MI_get_schema(self).names)
+        return self.itervalues(indices)
 
     def update(self, *args, **kw):
         '''
@@ -1289,17 +2888,19 @@ class MIMapping(AttrOrdDict):
         '''
         raise NotImplementedError
 
-    def viewkeys(self, index=None):
+    def keys(self, index=None):
         '''a set-like object providing a view on the keys in ``index``
         (defaults to the first index)'''
         return MIKeysView(self, index)
 
-    def viewvalues(self, index=None):
+    def values(self, index=None):
         '''a set-like object providing a view on the values in ``index``
-        (defaults to all indices except the first index)'''
+        (defaults to all indices except the first index).
+
+        See the notes for ``itervalues()``'''
         return MIValuesView(self, index)
 
-    def viewitems(self, index=None):
+    def items(self, index=None):
         '''a set-like object providing a view on the items in ``index``
         (defaults to all indices)'''
         return MIItemsView(self, index)
@@ -1318,9 +2919,87 @@ class MIMapping(AttrOrdDict):
         else:  # empty
             return dict_type()
 
+    def accessor(self, index1=0, *index2):
+        '''
+        Return a prepared ``MIAccessor`` for the lookup ``d[index1:key, index2]``,
+        which parses the indices only once and can be called many times::
+
+            get_uid = user.accessor('name', 'uid')
+            get_uid['jack'] <==> get_uid('jack') <==> user['name':'jack', 'uid']
+            get_uid.get('alice') -> None
+
+            user.accessor('name', 'uid', 'ip')['jack'] -> (1, '192.1')
+
+        ``index2`` defaults to all indices except ``index1`` (as in ``d[index1:key]``).
+        '''
+        if len(index2) == 1:
+            index2 = index2[0]
+        elif len(index2) == 0:
+            index2 = None
+        else:
+            index2 = list(index2)
+        return MIAccessor(self, index1, index2)
+
+    def get_many(self, keys, index=0, columns=None, default=None, array=False):
+        '''
+        Look up many ``keys`` in ``index`` at once, and return a list of the
+        value(s) in ``columns`` of each key (as ``d[index:key, columns]``),
+        or ``default`` if a key is not found::
+
+            user.get_many(['jack', 'bob'], 'name', 'uid') -> [1, None]
+            user.get_many(['jack'], 'name', ['uid', 'ip']) -> [(1, '192.1')]
+
+        The indices are resolved only once and no exception is raised for
+        missing (or unhashable) keys. ``columns`` defaults to all indices
+        except ``index``. Multiple values in ``columns`` are returned as a
+        tuple.
+
+        If ``array==True``, return a NumPy array instead (requires NumPy).
+        '''
+        keys = cvt_iter(keys)
+        if self.indices:
+            acc = MIAccessor(self, index, columns)
+            get_rid, rows, project = acc._get, acc._rows, acc._project
+            try:
+                rids = map(get_rid, keys)
+            except TypeError: # unhashable keys are not found
+                rids = []
+                for key in keys:
+                    try:
+                        rids.append(get_rid(key))
+                    except TypeError:
+                        rids.append(None)
+            result = [default if rid is None else project(rows[rid]) for rid in rids]
+        else:
+            result = [default for key in keys]
+        return MI_to_array(result) if array else result
+
+    def contains_many(self, keys, index=0, array=False):
+        '''
+        Test the presence of many ``keys`` in ``index`` at once, and return
+        a list of bool::
+
+            user.contains_many(['jack', 'bob'], 'name') -> [True, False]
 
-if PY3: # change method names
-    MIMapping = MI_method_PY3(MIMapping)
+        If ``array==True``, return a NumPy array instead (requires NumPy).
+        '''
+        keys = cvt_iter(keys)
+        if self.indices:
+            schema = MI_get_schema(self)
+            index_d = schema.dicts[schema.key_to_index_single(index)]
+            contains = dict.__contains__.__get__(index_d)
+            try:
+                result = map(contains, keys)
+            except TypeError: # unhashable keys are not found
+                result = []
+                for key in keys:
+                    try:
+                        result.append(contains(key))
+                    except TypeError:
+                        result.append(False)
+        else:
+            result = [False for key in keys]
+        return MI_to_array(result) if array else result
 
 
 ############################################
@@ -1332,7 +3011,7 @@ class MIDict(MIMapping):
     where any index can serve as "keys" or "values",
     capable of assessing multiple values via its powerful indexing syntax,
     and suitable as a bidirectional/inverse dict (a drop-in replacement
-    for dict/OrderedDict in Python 2 & 3).
+    for dict/OrderedDict in Python 3).
 
     **Features**:
 
@@ -1340,7 +3019,7 @@ class MIDict(MIMapping):
     * Multi-value indexing syntax
     * Convenient indexing shortcuts
     * Bidirectional/inverse dict
-    * Compatible with normal dict in Python 2 & 3
+    * Compatible with normal dict
     * Accessing keys via attributes
     * Extended methods for multi-indices
     * Additional APIs to handle indices
@@ -1387,26 +3066,86 @@ class MIDict(MIMapping):
             d['jack', :] = ['jack2', 11] # replace item of key 'jack'
 
         '''
+        schema = self._schema
+        if (schema is not None and len(schema.names) == 2 and
+                not isinstance(args, (tuple, slice))):
+            # fast path of d[key] = value for 2 indices
+            rid = dict.get(self, args)
+            if self._shared: # shared with a snapshot: only the value changes
+                _MI_unshare(self, None if rid is None else [1])
+                schema = MI_get_schema(self)
+            inv = schema.dicts[1]
+            rows = self._rows
+            if rid is None:
+                if value in inv:
+                    raise ValueExistsError(value, 1, schema.names[1])
+                _MI_add_row(self, [args, value])
+            else:
+                old_value = rows.get_value(rid, 1)
+                if value != old_value:
+                    if value in inv:
+                        raise ValueExistsError(value, 1, schema.names[1])
+                    del inv[old_value]
+                    inv[value] = rid
+                rows.set_value(rid, 1, value)
+            return
+
         return _MI_setitem(self, args, value)
 
     def __delitem__(self, args):
         '''
         delete a key (and the whole item) via multi-indexing
         '''
+        if self._shared: # shared with a snapshot
+            _MI_unshare(self)
+        if not isinstance(args, (tuple, slice)): # fast path of a normal key
+            rid = dict.get(self, args)
+            if rid is not None:
+                _MI_del_row(self, rid)
+                return
         item = MI_parse_args(self, args, ingore_index2=True)
-        for i, v in enumerate(item):
-            if i == 0:
-                super(MIMapping, self).__delitem__(v)
-            else:
-                del self.indices[i][v]
+        _MI_del_row(self, MI_get_rid(self, item[0]))
+
+    def move_to_end(self, key, last=True):
+        '''
+        Move an existing ``key`` (and the whole item) to either end of the
+        dictionary. The item is moved to the right end if ``last`` is true
+        (the default) or to the beginning if ``last`` is false.
+
+        Support "multi-indexing" keys
+        '''
+        if self._shared: # shared with a snapshot
+            # only the order of the rows changes in MIRowStore
+            _MI_unshare(self, [] if hasattr(self._rows, 'move_to_end') else None)
+        item = MI_parse_args(self, key, ingore_index2=True)
+        rid = MI_get_rid(self, item[0])
+        rows = self._rows
+        if hasattr(rows, 'move_to_end'): # MIRowStore
+            rows.move_to_end(rid, last)
+            if self._pos is not None:
+                if last:
+                    self._pos.remove(rid)
+                    self._pos.append(rid)
+                else:
+                    self._pos = None # rebuild on next use
+        elif last:
+            _MI_add_row(self, _MI_del_row(self, rid))
+        else:
+            row = rows[rid]
+            _MI_reload(self, [row] + [r for r in rows.values() if r != row])
 
     def clear(self, clear_indices=False):
         'Remove all items. index names are removed if ``clear_indices==True``.'
+        if self._shared: # shared with a snapshot
+            _MI_unshare(self, empty=True)
         super(MIMapping, self).clear()
+        self._rows.clear()
+        self._pos = None
         if clear_indices:
             self.indices.clear()
+            self._schema = None
         else:
-            for index_d in self.indices[1:]:
+            for index_d in MI_get_schema(self).dicts[1:]:
                 index_d.clear()
 
     def update(self, *args, **kw):
@@ -1419,7 +3158,13 @@ class MIDict(MIMapping):
 
         Optional positional argument ``names`` is only allowed when ``self.indices``
         is empty (no indices are set yet).
+
+        All the items are validated before any change: if any value already
+        exists in an index (except being replaced by the update), a
+        ``DuplicateValuesError`` is raised and the dictionary is not changed.
         '''
+        if self._shared: # shared with a snapshot
+            _MI_unshare(self)
         if len(args) > 1 and self.indices:
             raise ValueError('Only one positional argument is allowed when the'
                              'index names are already set.')
@@ -1428,20 +3173,175 @@ class MIDict(MIMapping):
             _MI_init(self, *args, **kw)
             return
 
-        d = MIMapping(*args, **kw)
-        if not d.indices:
+        N = len(self.indices)
+        source = args[0] if args else None
+        if isinstance(source, MIMapping) and len(source.indices) == N and not kw:
+            # values in each index of source are already unique
+            _MI_merge(self, list(source._rows.values()), unique=True)
             return
 
-        names = force_list(self.indices.keys())
+        items, names, n_index = _MI_parse_init_args(args, kw)
+        if not items:
+            return
 
-        if len(d.indices) != len(names):
+        if n_index != N:
             raise ValueError('Length of update items (%s) does not match '
-                             'length of original items (%s)' %
-                             (len(d.indices), len(names)))
+                             'length of original items (%s)' % (n_index, N))
+
+        _MI_merge(self, items)
 
-        for key in d:
-            # use __setitem__() to handle duplicate
-            self[key] = d[key]
+    def set_many(self, rows, index=0):
+        '''
+        Set many ``rows`` (lists of values in all indices) at once: the item
+        of each existing key in ``index`` is updated in place, and the other
+        rows are added as new items::
+
+            user.set_many([['jack', 10, '192.10'], ['bob', 4, '192.4']])
+            user.set_many([['jack', 1, '192.1']], 'uid') # key in 'uid'
+
+        The whole batch is validated before any change: if any value already
+        exists in an index (except being replaced), a ``DuplicateValuesError``
+        is raised and the dictionary is not changed.
+        '''
+        if self._shared: # shared with a snapshot
+            _MI_unshare(self)
+        rows = cvt_iter(rows)
+        if not self.indices:  # empty; init again
+            _MI_init(self, rows)
+            return
+        schema = MI_get_schema(self)
+        for row in rows:
+            if len(row) != len(schema):
+                raise ValueError('Length of rows (%s) does not match length of '
+                                 'indices (%s)' % (len(row), len(schema)))
+        _MI_merge(self, rows, index=schema.key_to_index_single(index))
+
+    def delete_many(self, keys, index=0, ignore_missing=False):
+        '''
+        Delete the items of many ``keys`` in ``index`` at once::
+
+            user.delete_many(['jack', 'tony'])
+            user.delete_many([1, 2], 'uid')
+
+        All the keys are looked up before any deletion: if any key is not
+        found, a ``KeyError`` is raised and the dictionary is not changed,
+        unless ``ignore_missing==True``.
+
+        Return the number of deleted items.
+        '''
+        if self._shared: # shared with a snapshot
+            _MI_unshare(self)
+        keys = cvt_iter(keys)
+        rids, missing = set(), []
+        if self.indices:
+            schema = MI_get_schema(self)
+            i = schema.key_to_index_single(index)
+            get_rid = (super(MIMapping, self) if i == 0 else schema.dicts[i]).get
+            for key in keys:
+                rid = get_rid(key)
+                if rid is None:
+                    missing.append(key)
+                else:
+                    rids.add(rid)
+        else:
+            missing = list(keys)
+        if missing and not ignore_missing:
+            raise KeyError('Keys not found in index %r: %r' % (index, missing))
+        _MI_del_rows(self, rids)
+        return len(rids)
+
+    def delete_where(self, predicate, indices=None):
+        '''
+        Delete all the items for which ``predicate(item)`` is true, where
+        ``item`` is the value(s) in ``indices`` as in ``d.items(indices)``
+        (defaults to all indices)::
+
+            user.delete_where(lambda item: item[1] > 2) # uid > 2
+            user.delete_where(lambda uid: uid > 2, 'uid')
+
+        ``predicate`` is called on all the items before any deletion.
+
+        Return the number of deleted items.
+        '''
+        if not self.indices:
+            return 0
+        if self._shared: # shared with a snapshot
+            _MI_unshare(self)
+        if indices is None:
+            indices = force_list(MI_get_schema(self).names)
+        rows = self._rows
+        rids = [rid for rid, item in zip(rows, MI_rows_values(self, rows.values(), indices))
+                if predicate(item)]
+        _MI_del_rows(self, rids)
+        return len(rids)
+
+    def apply_patch(self, patch):
+        '''
+        Apply a ``patch`` from ``d.diff(other)`` (a dict of optional lists
+        ``'added'``, ``'removed'`` and ``'changed'``): delete the items of
+        the removed keys, update the items of the changed rows, and add the
+        added rows at the end.
+
+        The whole patch is validated before any change (see ``set_many()``
+        and ``delete_many()``): a ``KeyError`` is raised for any removed key
+        not found, and a ``DuplicateValuesError`` for any duplicate value.
+        '''
+        if self._shared: # shared with a snapshot
+            _MI_unshare(self)
+        rows = list(patch.get('changed', ())) + list(patch.get('added', ()))
+        removed = list(patch.get('removed', ()))
+        if not self.indices:  # empty; init again
+            if removed:
+                raise KeyError('Keys not found in index 0: %r' % (removed,))
+            _MI_init(self, rows)
+            return
+        n_index = len(self.indices)
+        for row in rows:
+            if len(row) != n_index:
+                raise ValueError('Length of rows (%s) does not match length of '
+                                 'indices (%s)' % (len(row), n_index))
+        get_rid = super(MIMapping, self).get
+        rids = set(imap(get_rid, removed))
+        if None in rids:
+            missing = [key for key in removed if get_rid(key) is None]
+            raise KeyError('Keys not found in index 0: %r' % (missing,))
+        _MI_merge(self, rows, deleted=rids)
+
+    def snapshot(self):
+        '''
+        Return a read-only ``FrozenMIDict`` of the current items, which is
+        not affected by later changes of the dictionary::
+
+            snap = user.snapshot()
+            user['jack'] = [10, '192.10'] # snap['jack'] -> [1, '192.1']
+
+        This is not a constant-time operation: it takes O(n) time to copy
+        the keys of the first index (the dict of the ``MIDict`` itself), but
+        it is several times faster than ``copy()``. The other index dicts and
+        the row store are shared with the snapshot, and the copying of the
+        shared parts is deferred to the first change of the dictionary that
+        needs them, which then takes O(n) time once: changing the values in
+        an index copies that index dict (or its column for ``MIColumnStore``);
+        adding or deleting items copies all the shared index dicts; and with
+        ``MIRowStore`` the first change copies the table of the row ids, then
+        each row is copied when it is changed.
+
+        Call it from the thread that changes the dictionary; other threads
+        can then read the snapshot freely.
+        '''
+        snap = FrozenMIDict()
+        if not self.indices:
+            return snap
+        schema = MI_get_schema(self)
+        rows = self._rows
+        if getattr(rows, '_front', None): # the snapshot never reorders its rows
+            rows._move_front()
+        map(super(MIMapping, snap).__setitem__, dict.keys(self), dict.values(self))
+        snap._rows = rows
+        _MI_set_indices(snap, schema.names, (snap,) + schema.dicts[1:])
+        self._shared = set(range(len(schema)))
+        self._shared_rows = True
+        return snap
 
 
     ############################################
@@ -1477,10 +3377,13 @@ class MIDict(MIMapping):
             raise ValueError('New indices names are not unique: %s' % (new_indices,))
 
         od_replace_key(self.indices, old_indices, new_indices, multi=True)
+        self._schema = None
 
 
     def reorder_indices(self, indices_order):
         'reorder all the indices'
+        if self._shared: # shared with a snapshot
+            _MI_unshare(self)
         # allow mixed index syntax like int
         indices_order, single = convert_index_to_keys(self.indices, indices_order)
         old_indices = force_list(self.indices.keys())
@@ -1496,14 +3399,13 @@ class MIDict(MIMapping):
 
         # must have more than 1 index to reorder
         new_idx = [old_indices.index(i) for i in indices_order]
-        # reorder items
-        items = [map(i.__getitem__, new_idx) for i in self.items()]
-        self.clear(True)
-        _MI_init(self, items, indices_order)
+        _MI_select_indices(self, new_idx)
 
 
     def add_index(self, values, name=None):
         'add an index of ``name`` with the list of ``values``'
+        if self._shared: # shared with a snapshot: the existing indices stay shared
+            _MI_unshare(self, [])
         if len(values) != len(set(values)):
             raise ValueError('Values in the new index are not unique')
 
@@ -1521,19 +3423,26 @@ class MIDict(MIMapping):
                 raise ValueError('Duplicate index name: %s' % (name,))
 
         if len(d) == 0:
-            items = [(v,) for v in values]
-        else:
-            items = [i+(v,) for i, v in zip(self.items(), values)]
-
-        names = force_list(d.keys()) + [name]
+            _MI_init(self, [(v,) for v in values], [name])
+            return
 
-        self.clear(True)
-        _MI_init(self, items, names)
+        if not values: # no items left
+            self.clear()
+        # the values are checked to be unique: only add the new index dict
+        # and the values in the rows
+        rows = self._rows
+        index_d = self.index_class(zip(values, rows)) # the row ids in order
+        rows.add_column(values)
+        d[name] = MIIndexView(self, index_d)
+        self._schema = None
 
 
     def remove_index(self, index):
         'remove one or more indices'
-        index_rm, single = convert_key_to_index(force_list(self.indices.keys()), index)
+        if self._shared: # shared with a snapshot
+            _MI_unshare(self)
+        names = force_list(MI_get_schema(self).names)
+        index_rm, single = convert_key_to_index(names, index)
         if single:
             index_rm = [index_rm]
 
@@ -1543,10 +3452,7 @@ class MIDict(MIMapping):
             self.clear(True)
             return
 
-        names = mget_list(force_list(self.indices.keys()), index_new)
-        items = [mget_list(i, index_new) for i in self.items()]
-        self.clear(True)
-        _MI_init(self, items, names)
+        _MI_select_indices(self, index_new)
 
 
 ############################################
@@ -1555,19 +3461,23 @@ class MIDict(MIMapping):
 class FrozenMIDict(MIMapping, Hashable):
     '''
     An immutable, hashable multi-index dictionary (similar to ``MIDict``).
+
+    The items are kept by a frozen ``MIFrozenStore`` (a tuple per index).
     '''
 
+    store_class = MIFrozenStore
+
     def __init__(self, *args, **kw):
         # set _hash as a normal attribute before init
         self._hash = None
 
         super(FrozenMIDict, self).__init__(*args, **kw)
+        _MI_freeze(self)
 
     def __hash__(self):
-        """Return the hash of this bidict."""
+        """Return the hash of this bidict (from the fingerprint of the rows)."""
         if self._hash is None:
-            self._hash = hash((frozenset(self.items()), frozenset(
-                self.indices.keys())))
+            self._hash = hash((self.fingerprint(), tuple(self.indices.keys())))
         return self._hash
 
 ############################################
@@ -1593,8 +3503,88 @@ class MIKeysView(KeysView):
             return False
 
     def __iter__(self):
-        for x in self._mapping.iterkeys(self.index):
-            yield x
+        return self._mapping.iterkeys(self.index)
+
+    def __getitem__(self, pos):
+        '''get the key at the position ``pos`` (int) in the order of items,
+        or a list of keys (slice)'''
+        return MI_values_at(self._mapping, pos, 0 if self.index is None else self.index)
+
+    def position(self, key):
+        '''return the position of ``key`` in the order of items.
+
+        A range of keys can be sliced by positions::
+
+            keys = d.keys('name')
+            keys[keys.position('jack') : keys.position('tony')]
+        '''
+        mapping = self._mapping
+        index = 0 if self.index is None else self.index
+        try:
+            index = MI_get_schema(mapping).key_to_index_single(index)
+            rid = MI_get_rid(mapping, key, index)
+        except KeyError:
+            raise ValueError('%r is not in the keys' % (key,))
+        return MI_get_positions(mapping).index(rid)
+
+    # set operations via the keys of the index dict (at the speed of
+    # built-in sets), instead of the generic ones of ``Set``
+
+    def _index_keys(self):
+        'the set-like view of the keys of the index dict'
+        mapping = self._mapping
+        if not mapping.indices:
+            return dict.keys({})
+        schema = MI_get_schema(mapping)
+        index = schema.key_to_index_single(0 if self.index is None else self.index)
+        return dict.keys(schema.dicts[index])
+
+    @staticmethod
+    def _other_keys(other):
+        if isinstance(other, MIKeysView):
+            return other._index_keys()
+        return other
+
+    def __and__(self, other):
+        return self._index_keys() & self._other_keys(other)
+
+    def __or__(self, other):
+        return self._index_keys() | self._other_keys(other)
+
+    def __sub__(self, other):
+        return self._index_keys() - self._other_keys(other)
+
+    def __xor__(self, other):
+        return self._index_keys() ^ self._other_keys(other)
+
+    __rand__ = __and__
+    __ror__ = __or__
+    __rxor__ = __xor__
+
+    def __rsub__(self, other):
+        return set(other) - self._index_keys()
+
+    def isdisjoint(self, other):
+        return self._index_keys().isdisjoint(self._other_keys(other))
+
+    def select(self, keys):
+        '''
+        Return a new dictionary of the same type with the items whose keys
+        in this index are in ``keys`` (e.g., the result of a set operation),
+        in the order of items::
+
+            d.keys('ip').select(d.keys('ip') & d2.keys('ip'))
+        '''
+        mapping = self._mapping
+        if not mapping.indices:
+            return mapping.__class__()
+        schema = MI_get_schema(mapping)
+        index = schema.key_to_index_single(0 if self.index is None else self.index)
+        get_rid = dict.get.__get__(schema.dicts[index]) # not MIMapping.get
+        rids = set(get_rid(key) for key in keys)
+        rows = mapping._rows
+        items = [list(rows[rid]) for rid in filter(rids.__contains__, rows)]
+        return mapping.__class__.from_rows(items, force_list(schema.names))
 
 
 class MIValuesView(ValuesView):
@@ -1608,14 +3598,15 @@ class MIValuesView(ValuesView):
         super(MIValuesView, self).__init__(mapping)
 
     def __contains__(self, value):
-        for v in self:
-            if value == v:
-                return True
-        return False
+        return _MI_contains_value(self._mapping, value, self.index)
 
     def __iter__(self):
-        for x in self._mapping.itervalues(self.index):
-            yield x
+        return self._mapping.itervalues(self.index)
+
+    def __getitem__(self, pos):
+        '''get the value at the position ``pos`` (int) in the order of items,
+        or a list of values (slice)'''
+        return MI_values_at(self._mapping, pos, self.index)
 
 
 class MIItemsView(ItemsView):
@@ -1629,14 +3620,23 @@ class MIItemsView(ItemsView):
         super(MIItemsView, self).__init__(mapping)
 
     def __contains__(self, item):
-        for v in self:
-            if item == v:
-                return True
-        return False
+        mapping = self._mapping
+        index = self.index
+        if index is None and mapping.indices:
+            index = force_list(MI_get_schema(mapping).names)
+        return _MI_contains_value(mapping, item, index)
 
     def __iter__(self):
-        for x in self._mapping.iteritems(self.index):
-            yield x
+        return self._mapping.iteritems(self.index)
+
+    def __getitem__(self, pos):
+        '''get the item at the position ``pos`` (int) in the order of items,
+        or a list of items (slice)'''
+        mapping = self._mapping
+        index = self.index
+        if index is None:
+            index = force_list(MI_get_schema(mapping).names)
+        return MI_values_at(mapping, pos, index)
 
 
 class MIDictView(KeysView):
@@ -1662,8 +3662,7 @@ class MIDictView(KeysView):
             return False
 
     def __iter__(self):
-        for x in self._mapping.iterkeys(self.index_key):
-            yield x
+        return self._mapping.iterkeys(self.index_key)
 
     def iterkeys(self):
         for x in self:
@@ -1702,29 +3701,154 @@ class MIDictView(KeysView):
                 'index_value={0.index_value})').format(self)
 
 
+class MIIndexView(Mapping):
+    '''a read-only dict-like object providing a view on an index (other than
+    the first one) of ``mapping``, which maps each key in that index to the
+    corresponding key in the first index (the values of ``mapping.indices``)'''
+
+    __slots__ = ('_mapping', '_index_d')
+
+    def __init__(self, mapping, index_d):
+        self._mapping = mapping
+        self._index_d = index_d # the internal index dict: key -> row id
+
+    def __getitem__(self, key):
+        return self._mapping._rows.get_value(self._index_d[key], 0)
+
+    def __contains__(self, key):
+        try:
+            return key in self._index_d
+        except TypeError: # unhashable
+            return False
+
+    def __iter__(self):
+        'iterate through the keys in the order of the items'
+        mapping = self._mapping
+        for index, index_d in enumerate(MI_get_schema(mapping).dicts):
+            if index_d is self._index_d:
+                return mapping._rows.column(index)
+        return iter(self._index_d) # pragma: no cover
+
+    def __len__(self):
+        return len(self._index_d)
+
+    def __repr__(self):
+        return '%s(%r)' % (self.__class__.__name__, list(self.items()))
+
+
+############################################
+
+
+class MIAccessor(object):
+    '''
+    A prepared lookup ``d[index1:key, index2]`` of a MIMapping ``d``
+    (see ``MIMapping.accessor()``).
+
+    The indices are resolved once, so that each lookup only takes a hash
+    lookup of ``key`` in ``index1`` and a lookup of its row, without parsing
+    the arguments. Multiple values in ``index2`` are returned as a tuple
+    (like ``items()``).
+
+    The accessor follows the changes of the items in ``d``, and resolves the
+    indices again after they are changed (e.g., by ``rename_index()``).
+    '''
+
+    __slots__ = ('_mapping', 'index1', 'index2', '_schema', '_rows',
+                 '_getitem', '_get', '_contains', '_project')
+
+    def __init__(self, mapping, index1=0, index2=None):
+        self._mapping = mapping
+        self.index1 = index1
+        self.index2 = index2
+        self._compile()
+
+    def _compile(self):
+        'resolve the indices and bind the lookup functions'
+        mapping = self._mapping
+        self._schema = schema = MI_get_schema(mapping)
+        index1 = schema.key_to_index_single(self.index1)
+        index2 = self.index2
+        if index2 is None:  # defaults to all indices except index1
+            index2 = [i for i in range(len(schema)) if i != index1]
+            if len(index2) == 1:
+                index2 = index2[0]
+            elif not index2: # index2 defaults to the only one index
+                index2 = index1
+        else:
+            index2 = schema.key_to_index(index2)
+
+        # bind methods of dict to use the internal dict of MIMapping directly
+        index_d = schema.dicts[index1]
+        self._getitem = dict.__getitem__.__get__(index_d)
+        self._get = dict.get.__get__(index_d)
+        self._contains = dict.__contains__.__get__(index_d)
+        self._rows, self._project = mapping._rows.projection(index2)
+
+    def __getitem__(self, key):
+        'get the value(s) of ``key``; raise KeyError if not found'
+        if self._mapping._schema is not self._schema:  # indices changed
+            self._compile()
+        return self._project(self._rows[self._getitem(key)])
+
+    __call__ = __getitem__
+
+    def get(self, key, default=None):
+        'get the value(s) of ``key`` if found, else ``default``'
+        if self._mapping._schema is not self._schema:  # indices changed
+            self._compile()
+        rid = self._get(key)
+        if rid is None:
+            return default
+        return self._project(self._rows[rid])
+
+    def __contains__(self, key):
+        if self._mapping._schema is not self._schema:  # indices changed
+            self._compile()
+        return self._contains(key)
+
+    def __repr__(self):
+        return '{0.__class__.__name__}({0._mapping!r}, {0.index1!r}, {0.index2!r})'.format(self)
+
+
 ############################################
 
 #__all__ = [k for k in globals() if k[:1] != '_']
 __all__ = [
  'AttrDict',
  'AttrOrdDict',
+ 'DuplicateValuesError',
  'FrozenMIDict',
  'IdxOrdDict',
  'IndexDict',
  'IndexDict_check_key_type',
+ 'IndexDict_keys',
  'ItemsView',
  'KeysView',
+ 'MIAccessor',
+ 'MIColumnStore',
+ 'MIFrozenStore',
  'MIDict',
  'MIDictView',
+ 'MIIndexView',
  'MIItemsView',
  'MIKeysView',
  'MIMapping',
  'MIMappingError',
+ 'MIRowStore',
+ 'MISchema',
  'MIValuesView',
  'MI_check_index_name',
+ 'MI_find_duplicates',
  'MI_get_item',
+ 'MI_get_positions',
+ 'MI_get_rid',
+ 'MI_get_schema',
  'MI_parse_args',
+ 'MI_rows_values',
+ 'MI_to_array',
+ 'MI_values_at',
  'OrderedDict',
+ 'PositionIndex',
  'ValueExistsError',
  'ValuesView',
  'convert_dict',
@@ -70,7 +70,7 @@ setup(
     description=
         'MIDict (Multi-Index Dict) can be indexed by any "keys" or "values", suitable as a '
         'bidirectional/inverse dict or a multi-key/multi-value dict (a drop-in replacement '
-        'for dict in Python 2 & 3).',
+        'for dict in Python 3).',
     long_description=long_description,
     author=UltraMagicString('Shenggao Zhu'),
     author_email='zshgao@gmail.com',
@@ -80,6 +80,7 @@ setup(
     keywords = 'dict, dictionary, mapping, bidirectional, bijective, two-way, double, inverse, reverse, '
         'multiple, index, multiple indices, multiple values, multiple keys, MIMapping, MIDict, FrozenMIDict, '
         'AttrDict, IndexDict, multi-indexing syntax',
+    python_requires='>=3.6',
     install_requires=[],
     classifiers=[
         'Development Status :: 4 - Beta',
@@ -88,12 +89,16 @@ setup(
         'Natural Language :: English',
         'Operating System :: OS Independent',
         'Programming Language :: Python',
-        'Programming Language :: Python :: 2',
-        'Programming Language :: Python :: 2.7',
         'Programming Language :: Python :: 3',
-        'Programming Language :: Python :: 3.3',
-        'Programming Language :: Python :: 3.4',
-        'Programming Language :: Python :: 3.5',
+        'Programming Language :: Python :: 3 :: Only',
+        'Programming Language :: Python :: 3.6',
+        'Programming Language :: Python :: 3.7',
+        'Programming Language :: Python :: 3.8',
+        'Programming Language :: Python :: 3.9',
+        'Programming Language :: Python :: 3.10',
+        'Programming Language :: Python :: 3.11',
+        'Programming Language :: Python :: 3.12',
+        'Programming Language :: Python :: 3.13',
         'Topic :: Scientific/Engineering :: Mathematics',
         'Topic :: Software Development :: Libraries :: Python Modules',
         'Topic :: Utilities',
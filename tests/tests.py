@@ -14,9 +14,7 @@ import sys, os
 sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
 from midict import *
-from midict import PY2, PY3 # not in midict.__all__
-if PY3:
-    from midict import map
+from midict import PY37, map # not in midict.__all__
 
 
 def call(obj, func_name, *args, **kw):
@@ -170,6 +168,95 @@ class TestBasic(unittest.TestCase):
         del d[:]
         self.assertEqual(d, IndexDict())
 
+    def test_IndexDict_keys(self):
+        import copy
+        for cls in [IndexDict, IdxOrdDict]:
+            d = cls(zip('abc', range(3)))
+            self.assertEqual(d[1], 1)
+            self.assertEqual(d[-1], 2)
+            d['d'] = 3 # new key
+            self.assertEqual(d[3], 3)
+            del d['a']
+            self.assertEqual(d[0:'d'], [1, 2])
+            d.update(e=4)
+            self.assertEqual(d[-1], 4)
+            self.assertIn('e', d)
+            self.assertNotIn({}, d) # unhashable
+            self.assertEqual(list(IndexDict_keys(d)), list(d.keys()))
+
+            # the cached keys are kept up to date when the length is unchanged
+            d2 = cls(a=1, b=2, c=3)
+            d2[0]
+            d2.pop('a')
+            d2['z'] = 9
+            self.assertEqual(d2[:], [2, 3, 9])
+            d2.popitem()
+            d2.setdefault('y', 8)
+            self.assertEqual(d2[:], [2, 3, 8])
+            d2.clear()
+            d2.setdefault('x', 7)
+            self.assertEqual(d2[:], [7])
+
+            # new keys set via a list are added to the cached keys
+            d2 = cls([('a', 1), ('b', 2), ('c', 3)])
+            d2[1]
+            d2[['x']] = [9]
+            d2.pop('a')
+            self.assertEqual(d2[0], 2)
+            d2[['y', 'b']] = [8, 20]
+            del d2['c']
+            self.assertEqual(d2[:], [20, 9, 8])
+
+            # a copy does not share the cached keys
+            for d3 in [copy.copy(d2), pickle.loads(pickle.dumps(d2))]:
+                d3['z'] = 7
+                del d3['b']
+                self.assertEqual(d3[:], [9, 8, 7])
+            self.assertEqual(d2[:], [20, 9, 8])
+
+        od_replace_key(d, 'b', 'x')
+        self.assertEqual(d[0], 1)
+        self.assertEqual(list(IndexDict_keys(d)), ['x', 'c', 'd', 'e'])
+        d.move_to_end('x')
+        self.assertEqual(d[-1], 1)
+
+
+    def test_PositionIndex(self):
+        import random
+        rnd = random.Random(0)
+        keys = list(range(50))
+        p = PositionIndex(keys)
+        for k in range(1000):
+            if keys and rnd.random() < 0.5:
+                key = rnd.choice(keys)
+                keys.remove(key)
+                p.remove(key)
+            else:
+                key = 50 + k
+                keys.append(key)
+                p.append(key)
+            self.assertEqual(len(p), len(keys))
+            if keys:
+                i = rnd.randrange(len(keys))
+                self.assertEqual(p[i], keys[i])
+                self.assertEqual(p[-i-1], keys[-i-1])
+                self.assertEqual(p.index(keys[i]), i)
+            for sl in [_s[:], _s[3:17], _s[::3], _s[-2:1:-2], _s[5:2]]:
+                self.assertEqual(p[sl], keys[sl])
+        self.assertEqual(list(p), keys)
+        self.assertEqual(list(reversed(p)), keys[::-1])
+
+        p.replace(keys[0], 'a')
+        self.assertEqual(p[0], 'a')
+        for handle, new_handle in [(-1, 'b'), (keys[1], 'a')]:
+            with self.assertRaises(ValueError):
+                p.replace(handle, new_handle)
+        self.assertEqual(list(p), ['a'] + keys[1:])
+
+        for func, arg in [(p.__getitem__, len(keys)), (p.index, -1), (p.remove, -1),
+                          (p.append, 'a'), (PositionIndex, [1, 1])]:
+            with self.assertRaises((IndexError, ValueError)):
+                func(arg)
 
     def test_ValueExistsError(self):
         for cls in [KeyError, MIMappingError, Exception]:
@@ -199,13 +286,9 @@ class TestMIMapping(unittest.TestCase):
                 d2 = MIDict(iter(items), iter(names))
 
                 ds = [d1, d2]
-                if PY2: # zip is iter
-                    d3 = MIDict(d1.viewitems(), iter(names))
-                    ds += [d3]
-                else:
-                    cols = list(zip(*items))
-                    d4 = MIDict(zip(*cols), names)
-                    ds += [d4]
+                cols = list(zip(*items))
+                d4 = MIDict(zip(*cols), names) # zip is iter
+                ds += [d4]
 
                 for d in ds:
                     self.assertEqual(list(d.indices.keys()), names)
@@ -300,6 +383,83 @@ class TestMIMapping(unittest.TestCase):
         with self.assertRaises(ValueError):
             MIMapping.fromkeys([1,2,3])
 
+    def test_from_rows(self):
+        d, items, names = get_data3()
+        for cls in [MIMapping, MIDict, FrozenMIDict]:
+            d2 = cls.from_rows(items, names)
+            self.assertEqual(d2.__class__, cls)
+            self.assertEqual(d2, d)
+            self.assertEqual(d2['uid':items[-1][1], 'name'], items[-1][0])
+        self.assertEqual(MIDict.from_rows([]), MIDict())
+
+        # the dict is still usable after the bulk load
+        d2 = MIDict.from_rows(items, names)
+        d2['name':'tom'] = [10, 11]
+        self.assertEqual(list(d2.keys()), [item[0] for item in items] + ['tom'])
+        self.assertEqual(d2.accessor('uid', 'name')[10], 'tom')
+
+        rows = [['jack', 1], ['tony', 2], ['jack', 3]]
+        d2 = MIDict.from_rows(rows, on_duplicate='first')
+        self.assertEqual(list(d2.items()), [('jack', 1), ('tony', 2)])
+        d2 = MIDict.from_rows(rows, on_duplicate='last')
+        self.assertEqual(list(d2.items()), [('jack', 3), ('tony', 2)])
+
+        rows = [['jack', 1], ['tony', 1], ['jack', 2], ['alice', 2]]
+        with self.assertRaises(DuplicateValuesError) as cm:
+            MIDict.from_rows(rows, ['name', 'uid'])
+        self.assertEqual(cm.exception.conflicts,
+                         [('jack', 0, 'name'), (1, 1, 'uid'), (2, 1, 'uid')])
+        self.assertTrue(isinstance(cm.exception, ValueExistsError))
+        str(cm.exception) # no error
+        with self.assertRaises(DuplicateValuesError) as cm:
+            MIDict.from_rows(rows, on_duplicate='last')
+        self.assertEqual(cm.exception.conflicts, [(2, 1, 'index_2')])
+
+        with self.assertRaises(ValueError):
+            MIDict.from_rows(rows, on_duplicate='error')
+        with self.assertRaises(ValueError):
+            MIDict.from_rows(rows + [[1]])
+        with self.assertRaises(ValueError):
+            MIDict.from_rows(rows, names)
+
+    def test_row_store(self):
+        d, items, names = get_data3()
+        for index_d in MI_get_schema(d).dicts[1:]:
+            self.assertNotIsInstance(index_d, OrderedDict)
+        if PY37:
+            self.assertNotIsInstance(d._rows, OrderedDict)
+
+        rows = MIRowStore()
+        rids = rows.extend([[k] for k in 'abcd'])
+        self.assertEqual(list(rids), [0, 1, 2, 3])
+        self.assertEqual(list(reversed(rows)), [3, 2, 1, 0])
+        rows.move_to_end(2, last=False)
+        rows.move_to_end(0)
+        self.assertEqual(list(rows.column(0)), ['c', 'b', 'd', 'a'])
+        # moves to the beginning mixed with other changes before reading
+        rows.move_to_end(1, last=False)
+        rows.move_to_end(3, last=False)
+        rows.append(['e'])
+        rows.move_to_end(1)
+        rows.move_to_end(0, last=False)
+        rows.pop(3)
+        self.assertEqual(list(rows), [0, 2, 4, 1])
+        self.assertEqual(list(reversed(rows)), [1, 4, 2, 0])
+        self.assertEqual(list(rows.share().values()), [['a'], ['c'], ['e'], ['b']])
+        with self.assertRaises(KeyError):
+            rows.move_to_end(3, last=False)
+
+        for store_class in [MIRowStore, MIColumnStore]:
+            rows = store_class(3)
+            rows.extend([[1, 2, 3], [4, 5, 6], [7, 8, 9]])
+            rows.pop(1)
+            self.assertEqual(list(rows.zip_columns([2, 0])), [(3, 1), (9, 7)])
+            self.assertEqual(list(rows.zip_columns([1])), [(2,), (8,)])
+            self.assertEqual(list(rows.zip_columns([])), [(), ()])
+            for index, value in [(1, 8), ([2, 0], (9, 7)), ([1], (8,))]:
+                rows_, project = rows.projection(index)
+                self.assertEqual(project(rows_[2]), value)
+
 
 
 
@@ -310,11 +470,48 @@ class TestFrozenMIDict(unittest.TestCase):
             for df in [FrozenMIDict(items, names), FrozenMIDict(d)]:
                 self.assertEqual(d, df)
 
+        # an empty source with new names
+        for cls in [MIDict, FrozenMIDict]:
+            for source in [MIDict(), FrozenMIDict()]:
+                d = cls(source, ['a', 'b'])
+                self.assertEqual(d, cls([], ['a', 'b']))
+                self.assertEqual(list(d.indices.keys()), ['a', 'b'])
+                self.assertEqual(cls(source), cls())
+
     def test_hash(self):
         d, items, names = get_data3(FrozenMIDict)
         {d:d}
         set([d, d])
 
+    def test_pop(self):
+        d, items, names = get_data3(FrozenMIDict)
+        with self.assertRaises(NotImplementedError):
+            d.pop(items[0][0])
+        self.assertEqual(d, FrozenMIDict(items, names))
+        self.assertEqual(list(d.keys()), [it[0] for it in items])
+
+    def test_frozen_store(self):
+        d, items, names = get_data3(MIDict)
+        del d[items[0][0]] # leave a hole in a column store
+        items = items[1:]
+        d2 = MIDict(d)
+        d2[items[0][0]] = items[0][1:]
+        for df in [FrozenMIDict(d), FrozenMIDict(d2), FrozenMIDict(items, names),
+                   FrozenMIDict.from_rows(items, names),
+                   FrozenMIDict(items + [items[0]], names)]: # duplicate item
+            self.assertIsInstance(df._rows, MIFrozenStore)
+            self.assertEqual(df._rows.columns, [tuple(c) for c in zip(*items)])
+            self.assertEqual(df, MIDict(items, names))
+            self.assertEqual(list(df.keys()), [item[0] for item in items])
+            self.assertEqual(df.keys()[-1], items[-1][0])
+            self.assertEqual(df.items()[:], [tuple(item) for item in items])
+            self.assertEqual(df[names[-1]:items[-1][-1], names[0]], items[-1][0])
+            self.assertEqual(list(reversed(df)), [item[0] for item in items[::-1]])
+            self.assertIs(df.copy()._rows, df._rows) # shared as it is
+        self.assertEqual(FrozenMIDict(d, names[::-1]).keys(names[-1]), d.keys())
+        with self.assertRaises(ValueError):
+            FrozenMIDict(d, names[1:])
+
 
 #==============================================================================
 # test MIDict
@@ -480,6 +677,15 @@ class TestMIDict_3_Indices(unittest.TestCase):
             with self.assertRaises(KeyError):
                 d[para]
 
+        # no indices: the cached schema has no fast path
+        d0 = MIDict()
+        for i in range(2):
+            with self.assertRaises(KeyError):
+                d0[key_exist]
+            with self.assertRaises(KeyError):
+                d0[index_exist:key_exist]
+            self.assertIsNone(d0.get(key_exist))
+            self.assertEqual(d0.get(key_exist, 0), 0)
 
 
     def test_setitem_nonempty(self):
@@ -774,6 +980,162 @@ class TestMIDict_3_Indices(unittest.TestCase):
             with self.assertRaises(ValueError):
                 d[para] = val
 
+    def test_setitem_order(self):
+        d, items, names = self.get_data()
+        N = len(names)
+        item_new = [get_unique_name('', d.keys(i)) for i in range(N)]
+        for i in range(N):
+            for key in [items[0][i], items[-1][i]]:
+                d2 = d.copy()
+                # change the values of all indices (including the key itself)
+                d2[i:key, :] = item_new
+                items2 = [item_new if it[i] == key else it for it in items]
+                self.assertEqual(d2, MIDict(items2, names))
+                for k in range(N):
+                    keys = [it[k] for it in items2]
+                    self.assertEqual(list(d2.keys(k)), keys)
+                    self.assertEqual(list(d2.__reversed__(k)), keys[::-1])
+                    for key2 in keys:
+                        self.assertIn(key2, d2.indices[k])
+
+    def test_move_to_end(self):
+        d, items, names = self.get_data()
+        d2 = d.copy()
+        d2.move_to_end(items[0][0])
+        self.assertEqual(list(d2.keys()), [it[0] for it in items[1:] + items[:1]])
+        d2.move_to_end(_s[names[-1]:items[0][-1]], last=False)
+        self.assertEqual(d2, d)
+        self.assertEqual(d2.popitem(), (items[-1][0], d[items[-1][0]]))
+        self.assertEqual(d2.popitem(last=False), (items[0][0], d[items[0][0]]))
+
+        with self.assertRaises(KeyError):
+            d2.popitem()
+
+    def test_pop(self):
+        d, items, names = self.get_data()
+        d2 = d.copy()
+        self.assertEqual(d2.pop(items[0][0]), d[items[0][0]])
+        self.assertEqual(d2, MIDict(items[1:], names))
+        self.assertEqual(list(d2.keys()), [it[0] for it in items[1:]])
+        key = _s[names[-1]:items[-1][-1]]
+        self.assertEqual(d2.pop(key), d[key])
+        self.assertEqual(d2, MIDict(items[1:-1], names))
+        # the popped values can be used again
+        d2[items[0][0]] = d[items[0][0]]
+        self.assertEqual(list(d2.keys()), [it[0] for it in items[1:-1] + items[:1]])
+
+        self.assertEqual(d2.pop(items[-1][0], None), None)
+        with self.assertRaises(KeyError):
+            d2.pop(items[-1][0])
+        with self.assertRaises(TypeError):
+            d2.pop(items[0][0], None, None)
+
+    def test_views_position(self):
+        d, items, names = self.get_data()
+        N = len(names)
+        items = [tuple(it) for it in items]
+        d2 = d.copy()
+        for k in range(5):
+            item = tuple(get_unique_name('', d2.keys(i)) for i in range(N))
+            d2[0:item[0], 1:] = list(item[1:])
+            items.append(item)
+        d2.keys()[0] # build the positions first: maintained by the changes below
+        del d2[items[0][0]]
+        items = items[1:]
+        item = tuple(get_unique_name('', d2.keys(i)) for i in range(N))
+        d2[0:item[0], 1:] = list(item[1:]) # same length as before del
+        items.append(item)
+        d2.move_to_end(items[0][0])
+        items = items[1:] + items[:1]
+
+        views = ['keys', 'values', 'items']
+        for f in views:
+            for index in [None] + list(range(N)):
+                view = call(d2, f, index)
+                values = list(view)
+                for i in range(len(values)):
+                    self.assertEqual(view[i], values[i])
+                    self.assertEqual(view[-i-1], values[-i-1])
+                for sl in [_s[:], _s[1:3], _s[::-2]]:
+                    self.assertEqual(view[sl], values[sl])
+                with self.assertRaises(IndexError):
+                    view[len(values)]
+
+        for index in range(N):
+            keys = call(d2, views[0], index)
+            for i, key in enumerate(keys):
+                self.assertEqual(keys.position(key), i)
+            with self.assertRaises(ValueError):
+                keys.position(get_unique_name('', keys))
+
+    def test_accessor(self):
+        d, items, names = self.get_data()
+        N = len(names)
+        d2 = d.copy()
+        key_not_exist = get_unique_name('', d2.keys())
+        for i in range(N):
+            index2_list = [[], [0], list(range(N)), [names[-1], 0], [_s[1:]]]
+            index2_list += [[k] for k in range(N)]
+            for index2 in index2_list:
+                acc = d2.accessor(names[i], *index2)
+                for item in items:
+                    value = d2[(_s[names[i]:item[i]],) + tuple(index2)]
+                    if isinstance(value, list):
+                        value = tuple(value)
+                    self.assertEqual(acc[item[i]], value)
+                    self.assertEqual(acc(item[i]), value)
+                    self.assertEqual(acc.get(item[i]), value)
+                    self.assertIn(item[i], acc)
+                self.assertEqual(acc.get(key_not_exist, 0), 0)
+                self.assertNotIn(key_not_exist, acc)
+                with self.assertRaises(KeyError):
+                    acc[key_not_exist]
+
+        acc = d2.accessor()
+        d2.rename_index(map(str, range(N)))
+        d2.reorder_indices(list(range(N))[::-1]) # resolve the indices again
+        for key in d2:
+            value = d2[key]
+            self.assertEqual(acc[key], value if N == 2 else tuple(value))
+        repr(acc)
+
+        with self.assertRaises(KeyError):
+            d.accessor(get_unique_name('', names))
+
+    def test_get_many(self):
+        d, items, names = self.get_data()
+        N = len(names)
+        key_not_exist = get_unique_name('', d.keys())
+        for i in range(N):
+            keys = [item[i] for item in items] + [key_not_exist]
+            for columns in [None, names[-1], [names[-1], 0]]:
+                values = []
+                for key in keys[:-1]:
+                    if columns is None:
+                        value = d[names[i]:key]
+                    else:
+                        value = d[names[i]:key, columns]
+                    values.append(tuple(value) if isinstance(value, list) else value)
+                self.assertEqual(d.get_many(keys, names[i], columns, -1), values + [-1])
+            self.assertEqual(d.contains_many(iter(keys), i),
+                             [True] * len(items) + [False])
+        self.assertEqual(d.get_many(iter([items[0][0]]), columns=0), [items[0][0]])
+        self.assertEqual(d.contains_many([[], items[0][0]]), [False, True]) # unhashable
+        self.assertEqual(d.get_many(iter([[], items[0][0]]), columns=0, default=-1),
+                         [-1, items[0][0]])
+        self.assertEqual(MIDict().get_many([1], default=0), [0])
+        self.assertEqual(MIDict().contains_many([1]), [False])
+        with self.assertRaises(KeyError):
+            d.get_many([], get_unique_name('', names))
+
+        try:
+            import numpy
+        except ImportError:
+            with self.assertRaises(ImportError):
+                d.contains_many([], array=True)
+        else:
+            self.assertEqual(d.contains_many([items[0][0]], array=True).tolist(), [True])
+
     def test_delitem(self):
         d, items, names = self.get_data()
         N = len(names)
@@ -836,6 +1198,57 @@ class TestMIDict_3_Indices(unittest.TestCase):
             with self.assertRaises(TypeError): # unhashable type
                 del d[para]
 
+    def test_set_many(self):
+        d, items, names = self.get_data()
+        N = len(names)
+        new_items = [[(k, 'tom') for k in range(N)], [(k, 'bob') for k in range(N)]]
+        # update the first item by its key in the last index, add new items
+        item0 = [(0, 'jack')] + items[0][1:]
+        d2 = d.copy()
+        d2.set_many([item0] + new_items, names[-1])
+        self.assertEqual(list(d2.keys()), [item0[0]] + [item[0] for item in items[1:]] +
+                         [item[0] for item in new_items])
+        self.assertEqual(d2[names[-1]:item0[-1], names[0]], item0[0])
+        self.assertNotIn(items[0][0], d2)
+
+        d2 = d.copy()
+        for rows in [[items[0][:1] + items[1][1:]], # value of another item
+                     [new_items[0], new_items[1][:1] + new_items[0][1:]]]: # duplicates in rows
+            with self.assertRaises(DuplicateValuesError):
+                d2.set_many(rows)
+            self.assertEqual(d2, d)
+        with self.assertRaises(ValueError):
+            d2.set_many([items[0] + items[0]])
+
+        d2 = MIDict()
+        d2.set_many(items)
+        self.assertEqual(list(d2.items()), list(map(tuple, items)))
+
+    def test_delete_many(self):
+        d, items, names = self.get_data()
+        for index in [0, names[-1]]:
+            i = names.index(index) if index else 0
+            d2 = d.copy()
+            self.assertEqual(d2.delete_many([items[0][i], items[0][i]], index), 1)
+            self.assertEqual(list(d2.keys()), [item[0] for item in items[1:]])
+            with self.assertRaises(KeyError):
+                d2.delete_many([items[0][i], items[-1][i]], index)
+            self.assertEqual(len(d2), len(items) - 1) # not changed
+            self.assertEqual(d2.delete_many([items[0][i], items[-1][i]], index,
+                                            ignore_missing=True), 1)
+            self.assertEqual(len(d2), len(items) - 2)
+            self.assertNotIn(items[-1][i], d2.indices[index])
+
+        d2 = d.copy()
+        self.assertEqual(d2.delete_where(lambda key: key != items[0][0], names[0]),
+                         len(items) - 1)
+        self.assertEqual(list(d2.items()), [tuple(items[0])])
+        self.assertEqual(d2.delete_where(lambda item: False), 0)
+        d2['x'] = [(k, 'x') for k in range(1, len(names))] if len(names) > 2 else 'x'
+        self.assertEqual(d2.delete_where(lambda item: item[0] == 'x'), 1)
+        self.assertEqual(list(d2.items()), [tuple(items[0])])
+        self.assertEqual(MIDict().delete_where(bool), 0)
+
 
     def test_cmp(self):
         d, items, names = self.get_data()
@@ -851,19 +1264,10 @@ class TestMIDict_3_Indices(unittest.TestCase):
 
         for x in [1, dn, ds, dct]:
             self.assertNotEqual(d, x)
-        if PY2:
-            self.assertLess(d, dct)
-            self.assertGreater(dct, d)
-            for x in [1, dn, ds]:
-                self.assertGreater(d, x)
-                self.assertGreaterEqual(d, x)
-                self.assertLess(x, d)
-                self.assertLessEqual(x, d)
-        else:
-            for x in [dn, ds]:
-                for m in ['__lt__',  '__gt__', '__le__','__ge__']:
-                    with self.assertRaises(TypeError):
-                        call(d, m, x)
+        for x in [dn, ds]:
+            for m in ['__lt__',  '__gt__', '__le__','__ge__']:
+                with self.assertRaises(TypeError):
+                    call(d, m, x)
 
     def test_repr(self):
         for cls in [MIMapping, MIDict, FrozenMIDict]:
@@ -886,6 +1290,26 @@ class TestMIDict_3_Indices(unittest.TestCase):
             self.assertEqual(d, d2)
             self.assertIs(d2.indices[0], d2)
 
+    def test_reduce_columns(self):
+        d, items, names = self.get_data()
+        vars(d)['extra'] = [1] # a normal attribute (see AttrDict)
+        d.add_index([2**70 + i for i in range(len(d))], 'big') # not packed
+        d.add_index([i + 0.5 for i in range(len(d))], 'float')
+        d.add_index([i == 0 for i in range(len(d))], 'bool') # not packed
+        for protocol in range(pickle.HIGHEST_PROTOCOL + 1):
+            for d1 in [d, MIDict(), FrozenMIDict(d)]:
+                d2 = pickle.loads(pickle.dumps(d1, protocol))
+                self.assertEqual(d2.__class__, d1.__class__)
+                self.assertEqual(list(d2.items()), list(d1.items()))
+                self.assertEqual(vars(d2).get('extra'), vars(d1).get('extra'))
+                self.assertEqual(list(map(type, d2.values('bool'))) if d1 else [],
+                                 [bool] * len(d1))
+
+        if protocol >= 5: # out-of-band buffers of the 'uid' and 'float' columns
+            buffers = []
+            s = pickle.dumps(d, protocol, buffer_callback=buffers.append)
+            self.assertEqual(len(buffers), 2)
+            self.assertEqual(pickle.loads(s, buffers=buffers), d)
 
     def test_copy(self):
         d, items, names = self.get_data()
@@ -894,6 +1318,167 @@ class TestMIDict_3_Indices(unittest.TestCase):
             self.assertEqual(d, d2)
             self.assertIs(d2.indices[0], d2)
 
+    def test_copy_independent(self):
+        import copy
+        d, items, names = self.get_data()
+        for d2 in [d.copy(), copy.copy(d), copy.deepcopy(d)]:
+            self.assertIs(type(d2._rows), type(d._rows))
+            del d2[items[0][0]]
+            d2[names[-1]:items[-1][-1], names[0]] = 'x'
+            d2['y'] = items[0][1:] if len(names) > 2 else items[0][1]
+            self.assertEqual(d, MIDict(items, names))
+            self.assertEqual(d2, MIDict(items[1:-1] + [['x'] + items[-1][1:]] +
+                                        [['y'] + items[0][1:]], names))
+
+        class Key(object): # hashable and mutable
+            def __init__(self, value):
+                self.value = value
+        keys = [Key(k) for k in range(len(items))]
+        d = MIDict([[k] + item[1:] for k, item in zip(keys, items)], names)
+        vars(d)['extra'] = [1] # a normal attribute (see AttrDict)
+        d2 = copy.deepcopy(d)
+        self.assertEqual([k.value for k in d2.keys()], list(range(len(items))))
+        self.assertFalse(set(d2.keys()) & set(keys))
+        self.assertEqual(d2.extra, [1])
+        self.assertIsNot(d2.extra, d.extra)
+        self.assertEqual(list(d2.values()), list(d.values()))
+
+    def test_fingerprint(self):
+        d, items, names = self.get_data()
+        d2 = MIDict(items, names)
+        self.assertEqual(d.fingerprint(), d2.fingerprint())
+        self.assertEqual(hash(FrozenMIDict(d)), hash(FrozenMIDict(items, names)))
+
+        def check():
+            fresh = MIDict(list(d.items()), list(d.indices))
+            self.assertEqual(d.fingerprint(), fresh.fingerprint())
+            self.assertEqual(d, fresh)
+
+        d[names[-1]:items[-1][-1], names[0]] = 'x'
+        check()
+        self.assertNotEqual(d, d2)
+        self.assertNotEqual(d.fingerprint(), d2.fingerprint())
+        del d[items[0][0]]
+        check()
+        d['y'] = items[0][1:] if len(names) > 2 else items[0][1]
+        d.move_to_end('x', last=False)
+        check()
+        d.set_many([['z'] + items[0][1:]], names[1])
+        check()
+        snap = d.snapshot()
+        d.reorder_indices(names[::-1])
+        check()
+        d.add_index(range(len(d)), 'new')
+        check()
+        self.assertEqual(hash(snap), hash(FrozenMIDict(snap)))
+
+        # values swapped between rows
+        self.assertNotEqual(MIDict([[1, 2], [3, 4]]).fingerprint(),
+                            MIDict([[1, 4], [3, 2]]).fingerprint())
+        self.assertNotEqual(hash(FrozenMIDict([[1, 2], [3, 4]])),
+                            hash(FrozenMIDict([[1, 4], [3, 2]])))
+        self.assertLess(d.fingerprint(), 2**64)
+        self.assertGreaterEqual(d.fingerprint(), 0)
+        d.clear()
+        check()
+
+    def test_diff_patch(self):
+        d, items, names = self.get_data()
+        self.assertEqual(d.diff(d.copy()), {'added': [], 'removed': [], 'changed': []})
+
+        # remove the first item, swap the values of the last two items in the
+        # last index and add an item with the values of the first item
+        new_items = [list(item) for item in items[1:]]
+        new_items[-1][-1], new_items[0][-1] = new_items[0][-1], new_items[-1][-1]
+        new_items.append(['x'] + items[0][1:])
+        d2 = MIDict(new_items, names)
+        patch = d.diff(d2)
+        changed = [tuple(item) for item in new_items[:-1] if item not in items]
+        self.assertEqual(patch, {'added': [tuple(new_items[-1])],
+                                 'removed': [items[0][0]], 'changed': changed})
+        self.assertEqual(d2.diff(d)['removed'], ['x'])
+
+        d3 = d.copy()
+        with self.assertRaises(KeyError):
+            d3.apply_patch({'removed': ['x']})
+        with self.assertRaises(DuplicateValuesError):
+            d3.apply_patch({'added': [['x'] + items[1][1:]]})
+        self.assertEqual(d3, d)
+        d3.apply_patch(patch)
+        self.assertEqual(d3, d2)
+        self.assertEqual(d3.diff(d2), {'added': [], 'removed': [], 'changed': []})
+
+        with self.assertRaises(ValueError):
+            d.diff(MIDict(items, names[::-1]))
+
+    def test_snapshot(self):
+        d, items, names = self.get_data()
+        snap = d.snapshot()
+        self.assertIsInstance(snap, FrozenMIDict)
+        self.assertEqual(snap, FrozenMIDict(items, names))
+        self.assertEqual(hash(snap), hash(FrozenMIDict(items, names)))
+
+        d[names[-1]:items[-1][-1], names[0]] = 'x'
+        snap2 = d.snapshot()
+        del d[items[0][0]]
+        d['y'] = items[0][1:] if len(names) > 2 else items[0][1]
+        d.move_to_end('x', last=False)
+        new_items = ([['x'] + items[-1][1:]] + items[1:-1] + [['y'] + items[0][1:]])
+        self.assertEqual(d, MIDict(new_items, names))
+        self.assertEqual(snap, FrozenMIDict(items, names))
+        self.assertEqual(snap2, FrozenMIDict(items[:-1] + [['x'] + items[-1][1:]], names))
+        self.assertEqual(snap[names[-1]:items[-1][-1], names[0]], items[-1][0])
+
+        snap = d.snapshot()
+        d.reorder_indices(names[::-1])
+        d.add_index(range(len(d)), 'new')
+        self.assertEqual(snap, FrozenMIDict(new_items, names))
+        self.assertEqual(d, MIDict([item[::-1] + [i] for i, item in enumerate(new_items)],
+                                   names[::-1] + ['new']))
+        d.clear()
+        d['z'] = items[0][-2::-1] + [0] # key in names[-1]
+        self.assertEqual(snap, FrozenMIDict(new_items, names))
+        self.assertEqual(len(d), 1)
+
+    def test_snapshot_shared(self):
+        d, items, names = self.get_data()
+        d.move_to_end(items[-1][0], last=False)
+        items = items[-1:] + items[:-1]
+        snap = d.snapshot()
+        self.assertIs(d._rows, snap._rows)
+        schema, snap_schema = MI_get_schema(d), MI_get_schema(snap)
+        self.assertEqual([a is b for a, b in zip(schema.dicts, snap_schema.dicts)],
+                         [False] + [True] * (len(names) - 1))
+
+        # changing the values in the last index copies only that index
+        for i, item in enumerate(items):
+            d[names[0]:item[0], names[-1]] = ('new', i)
+        schema, snap_schema = MI_get_schema(d), MI_get_schema(snap)
+        self.assertEqual([a is b for a, b in zip(schema.dicts, snap_schema.dicts)],
+                         [False] + [True] * (len(names) - 2) + [False])
+        rows = d._rows
+        if isinstance(rows, MIColumnStore):
+            self.assertEqual([a is b for a, b in zip(rows.columns, snap._rows.columns)],
+                             [True] * (len(names) - 1) + [False])
+        else: # each row was copied once, so none is shared any more
+            self.assertIsNone(rows._cow)
+        self.assertEqual(snap, FrozenMIDict(items, names))
+        self.assertEqual(list(d.items(names)), [tuple(item[:-1]) + (('new', i),)
+                                                for i, item in enumerate(items)])
+
+        # once copied, the changed parts are not copied again
+        schema = MI_get_schema(d)
+        d[names[0]:items[0][0], names[-1]] = ('again', 0)
+        self.assertIs(MI_get_schema(d), schema)
+
+        # adding an item copies all the shared parts
+        value = [('added', i) for i in range(1, len(names))]
+        d['new'] = value if len(names) > 2 else value[0]
+        schema = MI_get_schema(d)
+        self.assertFalse(set(map(id, schema.dicts)) & set(map(id, snap_schema.dicts)))
+        self.assertEqual(snap, FrozenMIDict(items, names))
+        self.assertEqual(len(d), len(items) + 1)
+
     def test_reversed(self):
         d, items, names = self.get_data()
 
@@ -930,32 +1515,19 @@ class TestMIDict_3_Indices(unittest.TestCase):
         value_exist = values[0]
 
         funcs = ['keys', 'values', 'items']
-        funcs_views = ['viewkeys', 'viewvalues', 'viewitems']
         gt_data = [keys, values, items]
         test_data = [[key_exist, key_not_exist], [value_exist, value_not_exist],
                      [item_exist, item_not_exist]]
         # check gt
-        for f, fv, gt, test in zip(funcs, funcs_views, gt_data, test_data):
-            if PY2:
-                self.assertEqual(call(d, f), gt)
-                self.assertEqual(list(call(d, fv)), gt)
-            else:
-                self.assertEqual(list(call(d, f)), gt)
+        for f, gt, test in zip(funcs, gt_data, test_data):
+            self.assertEqual(list(call(d, f)), gt)
 
             v_exist, v_not_exist = test
-            if PY2:
-                for fn in [f, fv]:
-                    self.assertIn(v_exist, call(d, fn))
-                    self.assertNotIn(v_not_exist, call(d, fn))
-            else:
-                self.assertIn(v_exist, call(d, f))
-                self.assertNotIn(v_not_exist, call(d, f))
+            self.assertIn(v_exist, call(d, f))
+            self.assertNotIn(v_not_exist, call(d, f))
 
         # use index
-        if PY2:
-            funcs_all = funcs + funcs_views
-        else:
-            funcs_all = funcs
+        funcs_all = funcs
 
         for k in range(N):
             gt = [it[k] for it in items]
@@ -972,25 +1544,58 @@ class TestMIDict_3_Indices(unittest.TestCase):
         # empty
         d = MIDict()
         gt_data = [[], [], []]
-        for f, fv, gt in zip(funcs, funcs_views, gt_data):
-            if PY2:
-                self.assertEqual(call(d, f), gt)
-                self.assertEqual(list(call(d, fv)), gt)
-            else:
-                self.assertEqual(list(call(d, f)), gt)
+        for f, gt in zip(funcs, gt_data):
+            self.assertEqual(list(call(d, f)), gt)
 
             v_not_exist = None
-            if PY2:
-                for fn in [f, fv]:
-                    self.assertNotIn(v_not_exist, call(d, fn))
-            else:
-                self.assertNotIn(v_not_exist, call(d, f))
+            self.assertNotIn(v_not_exist, call(d, f))
 
         for i in [index_not_exist, N + 10, -N - 10]:
             for f in funcs_all:
                 with self.assertRaises(KeyError):
                     list(call(d, f, i))
 
+    def test_views_contains(self):
+        d, items, names = self.get_data()
+        del d[items[-1][0]]
+        d[items[0][0]] = items[-1][1:] if len(names) > 2 else items[-1][1]
+        views = [d.values(), d.items()] + [d.values(i) for i in names]
+        for view in views:
+            for x in list(view):
+                self.assertIn(x, view)
+            self.assertNotIn(get_unique_name('', view), view)
+            self.assertNotIn([], view) # unhashable
+
+        item = tuple(items[0][:1] + items[-1][1:]) # the changed item
+        self.assertIn(item, d.items())
+        self.assertNotIn(tuple(items[-1]), d.items())
+        self.assertNotIn(tuple(items[-1][:-1]) + (items[0][-1],), d.items())
+        self.assertNotIn(list(item), d.items())
+
+    def test_keys_set_ops(self):
+        d, items, names = self.get_data()
+        d2 = d.copy()
+        del d2[items[0][0]]
+        d2[get_unique_name('', d)] = get_unique_name('', d.values()) \
+            if len(names) == 2 else [get_unique_name('', d.values(i)) for i in names[1:]]
+        for index in names:
+            k1, k2 = d.keys(index), d2.keys(index)
+            s1, s2 = set(k1), set(k2)
+            for other in [k2, s2, list(s2)]:
+                self.assertEqual(k1 & other, s1 & s2)
+                self.assertEqual(k1 | other, s1 | s2)
+                self.assertEqual(k1 - other, s1 - s2)
+                self.assertEqual(k1 ^ other, s1 ^ s2)
+                self.assertEqual(other - k1, s2 - s1)
+                self.assertFalse(k1.isdisjoint(other))
+            self.assertEqual(s2 & k1, s1 & s2)
+            self.assertTrue(k1.isdisjoint([get_unique_name('', s1)]))
+
+            d3 = k1.select(k1 & k2)
+            self.assertEqual(d3, MIDict(items[1:], names))
+            self.assertIs(type(d3), type(d))
+        self.assertEqual(MIDict().keys() & d.keys(), set())
+
 
     def test_viewdict(self):
         d, items0, names = self.get_data()
@@ -1074,6 +1679,46 @@ class TestMIDict_3_Indices(unittest.TestCase):
             items2 = [list(range(N+1))] # len not equal
             d.update(items2)
 
+    def test_update_merge(self):
+        d, items, names = self.get_data()
+        N = len(names)
+        # swap the values of the first two items, add a new item
+        item0 = [items[0][0]] + items[1][1:]
+        item1 = [items[1][0]] + items[0][1:]
+        new_item = ['tom'] + [(k, 'tom') for k in range(1, N)]
+        for source in [[item0, item1, new_item],
+                       MIDict([item0, item1, new_item], names[::-1])]:
+            d2 = d.copy()
+            d2.update(source)
+            self.assertEqual(list(d2.items()), [tuple(item0), tuple(item1)] + [
+                             tuple(item) for item in items[2:]] + [tuple(new_item)])
+            self.assertEqual(d2[names[-1]:item0[-1], names[0]], item0[0])
+
+        # the last item of the same key is used
+        d2 = d.copy()
+        item = [items[0][0]] + [(k, 'bob') for k in range(1, N)]
+        d2.update([item0, item])
+        self.assertEqual(d2[items[0][0], :], item)
+
+        # all conflicts are reported and nothing is changed
+        d2 = d.copy()
+        with self.assertRaises(DuplicateValuesError) as cm:
+            d2.update([['tom'] + items[0][1:], ['bob'] + items[1][1:]])
+        self.assertEqual(len(cm.exception.conflicts), 2 * (N - 1))
+        self.assertEqual(d2, d)
+        with self.assertRaises(ValueExistsError):
+            d2.update([item0, ['tom'] + items[0][1:]])
+        self.assertEqual(d2, d)
+
+        # unchanged values are not written again: no row shared with a
+        # snapshot is copied
+        snap = d2.snapshot()
+        d2.update(items + [item])
+        if isinstance(d2._rows, MIRowStore):
+            self.assertEqual(d2._rows._cow, set(d2._rows) - set([MI_get_rid(d2, items[0][0])]))
+        self.assertEqual(list(d2.items()), [tuple(item)] + [tuple(it) for it in items[1:]])
+        self.assertEqual(snap, d)
+
     def test_rename_index(self):
         d, items, names = self.get_data()
         N = len(names)
@@ -1110,6 +1755,74 @@ class TestMIDict_3_Indices(unittest.TestCase):
             d.rename_index([''] * N) # duplicate names
 
 
+    def test_schema(self):
+        d, items, names = self.get_data()
+        N = len(names)
+        names2 = map(str, range(N))
+        d2 = d.copy()
+        schema = MI_get_schema(d2)
+        self.assertIs(MI_get_schema(d2), schema) # cached
+        self.assertEqual(schema.names, tuple(names))
+        self.assertEqual(schema.key_to_index(names[-1]), N - 1)
+        self.assertEqual(schema.key_to_index(names), list(range(N)))
+        self.assertIs(schema.dicts[0], d2)
+        with self.assertRaises(AttributeError):
+            schema.names = ()
+
+        ops = [('rename_index', [names2]), ('reorder_indices', [names2[::-1]]),
+               ('add_index', [list(range(len(d2))), 'x']), ('remove_index', ['x'])]
+        for f, args in ops:
+            call(d2, f, *args)
+            schema = MI_get_schema(d2)
+            self.assertEqual(schema.names, tuple(d2.indices.keys()))
+            self.assertIs(schema.dicts[0], d2.indices[0])
+            for view, index_d in zip(list(d2.indices.values())[1:], schema.dicts[1:]):
+                self.assertIs(view._index_d, index_d)
+            name = schema.names[-1]
+            for key in d2.keys(name):
+                self.assertEqual(d2[name:key, name], key)
+
+        d2.clear(True)
+        self.assertEqual(MI_get_schema(d2).names, ())
+
+        class SchemaMIDict(MIDict):
+            'builds the schema whenever an attribute is set (like dir() in Python 2)'
+            def __setattr__(self, name, value):
+                super(SchemaMIDict, self).__setattr__(name, value)
+                if vars(self).get('indices') is not None:
+                    MI_get_schema(self)
+
+        d3 = SchemaMIDict(items, names)
+        for d4 in [d3, d3.copy(), d3.snapshot()]:
+            self.assertEqual(MI_get_schema(d4).names, tuple(names))
+            self.assertEqual(d4[names[-1]:items[0][-1], names[0]], items[0][0])
+            self.assertEqual(d4.get(items[0][0]), d[items[0][0]])
+
+    def test_indices_view(self):
+        d, items, names = self.get_data()
+        for d2 in [d, d.copy(), FrozenMIDict(d), d.snapshot()]:
+            self.assertIs(d2.indices[0], d2)
+            for i in range(1, len(names)):
+                view = d2.indices[names[i]]
+                self.assertIsInstance(view, MIIndexView)
+                # maps each key in the index to the key in the first index
+                self.assertEqual(dict(view), dict((item[i], item[0]) for item in items))
+                self.assertEqual(list(view), [item[i] for item in items])
+                self.assertIn(items[0][i], view)
+                self.assertNotIn([], view)
+
+        d2 = d.copy()
+        d2[names[0]:items[0][0], names[0]] = 'new key'
+        self.assertEqual(d2.indices[-1][items[0][-1]], 'new key')
+        with self.assertRaises(TypeError): # read-only
+            d2.indices[-1][items[0][-1]] = 'other key'
+
+        # the keys follow the order of the items after a value is changed
+        d2[names[0]:'new key', names[-1]] = 'new value'
+        view = d2.indices[-1]
+        self.assertEqual(list(view), ['new value'] + [item[-1] for item in items[1:]])
+        self.assertEqual(list(view.values()), list(d2.keys()))
+
     def test_reorder_indices(self):
         d, items, names = self.get_data()
         N = len(names)
@@ -1126,6 +1839,15 @@ class TestMIDict_3_Indices(unittest.TestCase):
                 d2 = d.copy()
                 d2.reorder_indices(order)
                 self.assertEqual(list(d2.indices.keys()), names2)
+                items2 = [mget_list(item, idx) for item in items]
+                self.assertEqual(d2, MIDict(items2, names2))
+                for i, name in enumerate(names2):
+                    for item in items2:
+                        self.assertEqual(d2[name:item[i], names2], item)
+                        self.assertIn(item[i], d2.keys(name))
+                d2[items2[0][0]] = d2[items2[0][0]] # same values
+                del d2[items2[0][0]]
+                self.assertEqual(d2, MIDict(items2[1:], names2))
 
         with self.assertRaises(KeyError):
             d.reorder_indices([]) # len not equal
@@ -1161,6 +1883,17 @@ class TestMIDict_3_Indices(unittest.TestCase):
         with self.assertRaises(ValueError):
             d.add_index(list(range(L)), names[0]) # duplicate index name
 
+        d2 = d.copy()
+        del d2[items[0][0]] # leave a hole in the rows
+        d2.add_index(['a%s' % k for k in range(1, L)], 'x')
+        items2 = [it + ['a%s' % k] for k, it in enumerate(items) if k]
+        self.assertEqual(d2, MIDict(items2, names + ['x']))
+        self.assertEqual(d2['x':'a1', names[0]], items[1][0])
+        d2[names[0]:items[1][0], 'x'] = 'b'
+        self.assertEqual(d2['x':'b', names], items[1])
+        d2.add_index([]) # no items left
+        self.assertEqual(d2, MIDict([], names + ['x', 'index_%s' % (N + 2)]))
+
 
     def test_remove_index(self):
         d, items, names = self.get_data()
@@ -1185,6 +1918,17 @@ class TestMIDict_3_Indices(unittest.TestCase):
         d2.remove_index(list(range(N)))
         self.assertEqual(d2, d0)
 
+        for index in range(N):
+            d2 = d.copy()
+            d2.remove_index(index)
+            names2 = names[:index] + names[index+1:]
+            items2 = [it[:index] + it[index+1:] for it in items]
+            self.assertEqual(d2, MIDict(items2, names2))
+            for i, name in enumerate(names2):
+                self.assertEqual(d2[name:items2[-1][i], names2], items2[-1])
+            del d2[items2[0][0]]
+            self.assertEqual(d2, MIDict(items2[1:], names2))
+
 
 class TestMIDict_2_Indices(TestMIDict_3_Indices):
 
@@ -1225,15 +1969,7 @@ class TestMIDict_2_Indices(TestMIDict_3_Indices):
             for f in funcs:
                 self.assertEqual(call(d, f), call(d2, f))
 
-        if PY2:
-            funcs_ordered = ['keys', 'values', 'items']
-            for f in funcs_ordered:
-                self.assertEqual(set(call(d, f)), set(call(dct, f)))
-                self.assertEqual(call(d, f), call(od, f))
-
-        funcs_ordered_views = ['viewkeys', 'viewvalues', 'viewitems']
-        if PY3:
-            funcs_ordered_views = ['keys', 'values', 'items']
+        funcs_ordered_views = ['keys', 'values', 'items']
         test_data = [[key_exist, key_not_exist], [value_exist, value_not_exist],
                      [item_exist, item_not_exist]]
         for f, data in zip(funcs_ordered_views, test_data):
@@ -1246,8 +1982,6 @@ class TestMIDict_2_Indices(TestMIDict_3_Indices):
 
 
         funcs_key = ['__contains__', 'get']
-        if PY2:
-            funcs_key.append('has_key')
         for d2 in [dct, od]:
             for f in funcs_key:
                 for key in [key_exist, key_not_exist]:
@@ -1263,6 +1997,76 @@ class TestMIDict_2_Indices(TestMIDict_3_Indices):
         for t in exc_types[1:]:
             self.assertEqual(exc_types[0], t)
 
+    def test_fast_path(self):
+        d, items, names = self.get_data()
+        schema = d._schema
+        self.assertIs(schema.fast_lookup(0), schema.fast_lookup(0)) # cached
+        self.assertEqual(d['jack'], 1)
+        self.assertEqual(d[:1], 'jack')
+        self.assertEqual(d['name':'alice'], 3)
+        self.assertEqual(d.get('jack'), 1)
+        self.assertEqual(d.get('tony', 0), 0)
+        self.assertIn('jack', d)
+        self.assertNotIn([], d)
+
+        d['tony'] = 2
+        d['jack'] = 10
+        self.assertEqual(d, MIDict([['jack', 10], ['alice', 3], ['tony', 2]], names))
+        self.assertEqual(d[:10], 'jack')
+        with self.assertRaises(KeyError):
+            d[:1]
+        with self.assertRaises(ValueExistsError):
+            d['jack'] = 3
+        with self.assertRaises(ValueExistsError):
+            d['bob'] = 3
+        self.assertEqual(d, MIDict([['jack', 10], ['alice', 3], ['tony', 2]], names))
+
+        del d['alice']
+        self.assertEqual(d, MIDict([['jack', 10], ['tony', 2]], names))
+        with self.assertRaises(KeyError):
+            del d['alice']
+        with self.assertRaises(KeyError):
+            d[:3]
+
+
+class ColumnMIDict(MIDict):
+    store_class = MIColumnStore
+
+
+class TestMIDict_3_Indices_Columns(TestMIDict_3_Indices):
+    'run the tests of TestMIDict_3_Indices with MIColumnStore'
+
+    def get_data(self, cls=MIDict):
+        if cls is MIDict:
+            cls = ColumnMIDict
+        return super(TestMIDict_3_Indices_Columns, self).get_data(cls)
+
+    def test_copy(self):
+        d, items, names = self.get_data()
+        for d2 in [d.copy(), ColumnMIDict(d)]:
+            self.assertEqual(d.__class__, d2.__class__)
+            self.assertEqual(d, d2)
+            self.assertIsInstance(d2._rows, MIColumnStore)
+        self.assertEqual(MIDict(d), d)
+
+    def test_column_store(self):
+        d, items, names = self.get_data()
+        self.assertIsInstance(d._rows, MIColumnStore)
+        self.assertEqual(d._rows.columns, [list(c) for c in zip(*items)])
+
+        keys = [get_unique_name(str(k), d.keys()) for k in range(20)]
+        for k in keys:
+            d[k] = [(k, i) for i in range(1, len(names))]
+        for k in keys[:15]:
+            del d[k]
+        self.assertEqual(list(d.keys()), [item[0] for item in items] + keys[15:])
+        self.assertEqual(d[names[0]:keys[-1], names[-1]], (keys[-1], len(names) - 1))
+        for k in keys[15:]:
+            del d[k]
+        # the holes are removed once they outnumber the rows
+        self.assertLessEqual(d._rows.holes, 16)
+        self.assertEqual(d, MIDict(items, names))
+
 
 
 